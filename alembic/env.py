@@ -29,6 +29,15 @@ if config.config_file_name is not None:
 # Metadata
 target_metadata = SQLModel.metadata
 
+from app.db.search import SEARCH_TABLE_PREFIXES
+
+
+def include_name(name, type_, parent_names) -> bool:
+    # Full-text qidiruv jadvallari (FTS5 / tsvector) app.db.search da boshqariladi
+    if type_ == 'table':
+        return not name.startswith(SEARCH_TABLE_PREFIXES)
+    return True
+
 
 # (Ixtiyoriy) Constraint/index nomlari uchun konvensiya
 # from sqlalchemy import MetaData
@@ -57,6 +66,7 @@ def run_migrations_offline() -> None:
         compare_type=True,
         compare_server_default=True,
         render_as_batch=True,  # SQLite uchun muhim
+        include_name=include_name,
         # include_schemas=True,           # agar public dan tashqari schema ishlatsangiz
         # version_table_schema="public",  # Postgresda version jadvali qayerda saqlansin
     )
@@ -84,6 +94,7 @@ def run_migrations_online() -> None:
             compare_type=True,
             compare_server_default=True,
             render_as_batch=True,  # SQLite uchun muhim
+            include_name=include_name,
             # include_schemas=True,
             # version_table_schema="public",
         )
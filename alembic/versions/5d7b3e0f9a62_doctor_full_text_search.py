@@ -0,0 +1,31 @@
+"""doctor full text search
+
+Revision ID: 5d7b3e0f9a62
+Revises: 8c4e2a91d5f3
+Create Date: 2026-10-18 12:20:41.906352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.search import install_search, drop_search
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7b3e0f9a62'
+down_revision: Union[str, Sequence[str], None] = '8c4e2a91d5f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite: FTS5 doctor_fts + triggerlar, Postgres: doctor_search (tsvector, GIN) + triggerlar
+    install_search(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_search(op.get_bind())
@@ -0,0 +1,68 @@
+"""access path indexes
+
+Revision ID: 8c4e2a91d5f3
+Revises: 3f9a1c2d7b10
+Create Date: 2026-10-18 11:02:17.503114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e2a91d5f3'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.create_index('ix_appointment_doctor_start', ['doctor_id', 'start_at'], unique=False)
+        batch_op.create_index('ix_appointment_patient_start', ['patient_id', 'start_at'], unique=False)
+        batch_op.create_index('ix_appointment_room_start', ['room_id', 'start_at'], unique=False)
+        batch_op.create_index('ix_appointment_status_start', ['status', 'start_at'], unique=False)
+
+    with op.batch_alter_table('appointment_status_history', schema=None) as batch_op:
+        batch_op.create_index('ix_status_history_appointment_changed', ['appointment_id', 'changed_at'], unique=False)
+
+    with op.batch_alter_table('doctor_schedule', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_doctor_schedule_weekday'), ['weekday'], unique=False)
+
+    with op.batch_alter_table('payment', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_payment_method'), ['method'], unique=False)
+        batch_op.create_index(batch_op.f('ix_payment_status'), ['status'], unique=False)
+
+    with op.batch_alter_table('section', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_section_branch_id'), ['branch_id'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_role'), ['role'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_role'))
+
+    with op.batch_alter_table('section', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_section_branch_id'))
+
+    with op.batch_alter_table('payment', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_payment_status'))
+        batch_op.drop_index(batch_op.f('ix_payment_method'))
+
+    with op.batch_alter_table('doctor_schedule', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_doctor_schedule_weekday'))
+
+    with op.batch_alter_table('appointment_status_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_status_history_appointment_changed')
+
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointment_status_start')
+        batch_op.drop_index('ix_appointment_room_start')
+        batch_op.drop_index('ix_appointment_patient_start')
+        batch_op.drop_index('ix_appointment_doctor_start')
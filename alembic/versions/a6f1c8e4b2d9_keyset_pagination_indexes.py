@@ -0,0 +1,42 @@
+"""keyset pagination indexes
+
+Revision ID: a6f1c8e4b2d9
+Revises: 5d7b3e0f9a62
+Create Date: 2026-10-18 13:05:12.664021
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6f1c8e4b2d9'
+down_revision: Union[str, Sequence[str], None] = '5d7b3e0f9a62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.create_index('ix_appointment_start_at', ['start_at'], unique=False)
+
+    with op.batch_alter_table('doctor_schedule', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_doctor_schedule_doctor_id'), ['doctor_id'], unique=False)
+
+    with op.batch_alter_table('room', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_room_section_id'), ['section_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('room', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_room_section_id'))
+
+    with op.batch_alter_table('doctor_schedule', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_doctor_schedule_doctor_id'))
+
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointment_start_at')
@@ -0,0 +1,30 @@
+"""room closure index
+
+Revision ID: c3d9f2a7b815
+Revises: a6f1c8e4b2d9
+Create Date: 2026-10-18 15:20:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9f2a7b815'
+down_revision: Union[str, Sequence[str], None] = 'a6f1c8e4b2d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('room_closure', schema=None) as batch_op:
+        batch_op.create_index('ix_room_closure_room_to', ['room_id', 'closed_to'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('room_closure', schema=None) as batch_op:
+        batch_op.drop_index('ix_room_closure_room_to')
@@ -0,0 +1,30 @@
+"""user specialty index
+
+Revision ID: e7a2b4c91f06
+Revises: c3d9f2a7b815
+Create Date: 2026-10-18 16:02:37.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2b4c91f06'
+down_revision: Union[str, Sequence[str], None] = 'c3d9f2a7b815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_specialty_id'), ['specialty_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_specialty_id'))
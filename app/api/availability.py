@@ -0,0 +1,234 @@
+# Shifokor bo'sh vaqtlari: haftalik DoctorSchedule shablonlari aniq oynalarga yoyiladi, undan
+# bekor qilinmagan uchrashuvlar va (room_id berilsa) xona band/yopiq oraliqlari ayiriladi.
+# Barcha oraliqlar [start, end) ko'rinishida, saralangan va birlashtirilgan ro'yxatlar ustida
+# chiziqli sweep bilan hisoblanadi. Vaqtlar klinika mahalliy vaqti (naive datetime).
+#   python -m app.api.availability --days 14   # hisoblash narxini o'lchash
+import argparse
+import heapq
+import time as timer
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from typing import Iterable, Iterator, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.models import Appointment, DoctorSchedule, Room, RoomClosure, Section, User
+from app.models.enums import AppointmentStatus, Role, Weekday
+
+settings = get_settings()
+
+Interval = tuple[datetime, datetime]
+
+# date.weekday() tartibi: Mon=0 ... Sun=6
+WEEKDAYS = list(Weekday)
+
+
+def resolve_range(date_from: datetime | None, date_to: datetime | None) -> Interval:
+    # Jadval vaqtlari mahalliy (time), shuning uchun tz berilgan bo'lsa ham devor soati olinadi
+    start = (date_from or datetime.now()).replace(tzinfo=None)
+    end = date_to.replace(tzinfo=None) if date_to else start + timedelta(days=7)
+    if end <= start:
+        raise HTTPException(400, "'to' must be after 'from'")
+    if end - start > timedelta(days=settings.AVAILABILITY_MAX_DAYS):
+        raise HTTPException(400, f"Range is limited to {settings.AVAILABILITY_MAX_DAYS} days")
+    return start, end
+
+
+def merge(intervals: Iterable[Interval]) -> list[Interval]:
+    merged: list[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract(windows: Sequence[Interval], busy: Sequence[Interval]) -> list[Interval]:
+    # Ikkalasi ham saralangan va birlashtirilgan bo'lishi kerak
+    free: list[Interval] = []
+    i = 0
+    for start, end in windows:
+        while i < len(busy) and busy[i][1] <= start:
+            i += 1
+        j = i
+        while j < len(busy) and busy[j][0] < end:
+            if busy[j][0] > start:
+                free.append((start, busy[j][0]))
+            start = max(start, busy[j][1])
+            j += 1
+        if start < end:
+            free.append((start, end))
+    return free
+
+
+def expand(templates: Iterable[tuple[Weekday, time, time]], start: datetime, end: datetime) -> list[Interval]:
+    # Oyna boshi start bo'yicha kesilmaydi: slotlar jadval to'ri bo'yicha (oyna boshidan) sanaladi,
+    # start dan oldin boshlanganlari iter_slots(not_before=start) da tashlab yuboriladi
+    by_weekday = defaultdict(list)
+    for weekday, start_time, end_time in templates:
+        by_weekday[weekday].append((start_time, end_time))
+    windows = []
+    day = start.date()
+    while day <= end.date():
+        for start_time, end_time in by_weekday[WEEKDAYS[day.weekday()]]:
+            window_start = datetime.combine(day, start_time)
+            window_end = min(datetime.combine(day, end_time), end)
+            if window_start < window_end and window_end > start:
+                windows.append((window_start, window_end))
+        day += timedelta(days=1)
+    return merge(windows)
+
+
+def iter_slots(free: Iterable[Interval], minutes: int, not_before: datetime | None = None) -> Iterator[Interval]:
+    step = timedelta(minutes=minutes)
+    for start, end in free:
+        if not_before is not None and start < not_before:
+            # To'rdagi not_before dan keyingi birinchi slotga sakraymiz
+            start -= (start - not_before) // step * step
+        while start + step <= end:
+            yield start, start + step
+            start += step
+
+
+def split(free: Iterable[Interval], minutes: int, not_before: datetime | None = None) -> list[Interval]:
+    return list(iter_slots(free, minutes, not_before))
+
+
+def covers(free: Sequence[Interval], slot: Interval) -> bool:
+    # free saralangan va birlashtirilgan: slot boshlanishidan oldingi oxirgi oraliq uni to'liq qoplashi kerak
+    i = bisect_right(free, (slot[0], datetime.max)) - 1
+    return i >= 0 and free[i][1] >= slot[1]
+
+
+def overlapping(start: datetime, end: datetime, model=Appointment) -> list:
+    # (resurs, start_at) indeksida diapazon: uchrashuv MAX_APPOINTMENT_MINUTES dan uzun bo'lmaydi,
+    # shuning uchun [start, end) bilan kesishadiganlari shu oraliqda boshlangan
+    lookback = start - timedelta(minutes=settings.MAX_APPOINTMENT_MINUTES)
+    return [model.start_at >= lookback, model.start_at < end, model.end_at > start,
+            model.status != AppointmentStatus.cancelled]
+
+
+def closing(start: datetime, end: datetime) -> list:
+    return [RoomClosure.closed_to > start, RoomClosure.closed_from < end]
+
+
+def busy_query(column, ids, start: datetime, end: datetime):
+    return select(column, Appointment.start_at, Appointment.end_at).where(column.in_(ids), *overlapping(start, end))
+
+
+def closure_query(room_ids, start: datetime, end: datetime):
+    return (select(RoomClosure.room_id, RoomClosure.closed_from, RoomClosure.closed_to)
+            .where(RoomClosure.room_id.in_(room_ids), *closing(start, end)))
+
+
+async def doctor_free_slots(db: AsyncSession, doctor_id: int, start: datetime, end: datetime, minutes: int,
+                            room_id: int | None = None) -> list[Interval]:
+    schedule_q = (select(DoctorSchedule.weekday, DoctorSchedule.start_time, DoctorSchedule.end_time)
+                  .where(DoctorSchedule.doctor_id == doctor_id))
+    windows = expand((await db.execute(schedule_q)).all(), start, end)
+    if not windows:
+        return []
+    busy = [(s, e) for _, s, e in await db.execute(busy_query(Appointment.doctor_id, [doctor_id], start, end))]
+    if room_id is not None:
+        busy += [(s, e) for _, s, e in await db.execute(busy_query(Appointment.room_id, [room_id], start, end))]
+        busy += [(s, e) for _, s, e in await db.execute(closure_query([room_id], start, end))]
+    return split(subtract(windows, merge(busy)), minutes, not_before=start)
+
+
+async def _grouped(db: AsyncSession, q) -> dict[int, list]:
+    groups = defaultdict(list)
+    for key, *values in await db.execute(q):
+        groups[key].append(tuple(values))
+    return groups
+
+
+def _tagged(slots: Iterable[Interval], doctor_id: int) -> Iterator[tuple[datetime, datetime, int]]:
+    for slot_start, slot_end in slots:
+        yield slot_start, slot_end, doctor_id
+
+
+async def _earliest_in(db: AsyncSession, schedules: dict[int, list], room_ids: list[int] | None,
+                       start: datetime, end: datetime, minutes: int, k: int) -> list:
+    busy = await _grouped(db, busy_query(Appointment.doctor_id, list(schedules), start, end))
+    room_free = None
+    if room_ids is not None:
+        room_busy = await _grouped(db, busy_query(Appointment.room_id, room_ids, start, end))
+        for room_id, intervals in (await _grouped(db, closure_query(room_ids, start, end))).items():
+            room_busy[room_id] += intervals
+        room_free = {r: subtract([(start, end)], merge(room_busy[r])) for r in room_ids}
+
+    streams = [_tagged(iter_slots(subtract(expand(templates, start, end), merge(busy[doctor_id])), minutes,
+                                  not_before=start), doctor_id)
+               for doctor_id, templates in schedules.items()]
+    result = []
+    for slot_start, slot_end, doctor_id in heapq.merge(*streams):
+        room_id = None
+        if room_free is not None:
+            room_id = next((r for r, free in room_free.items() if covers(free, (slot_start, slot_end))), None)
+            if room_id is None:
+                continue
+        result.append((slot_start, slot_end, doctor_id, room_id))
+        if len(result) == k:
+            break
+    return result
+
+
+async def earliest_slots(db: AsyncSession, specialty_id: int, start: datetime, end: datetime, minutes: int,
+                         k: int, branch_id: int | None = None) -> list[tuple[datetime, datetime, int, int | None]]:
+    # Barcha shifokorlar birga: jadvallar, uchrashuvlar va filial xonalari har biri bitta IN so'rov
+    # bilan olinadi, har bir shifokorning bo'sh slotlari heapq.merge bilan vaqt bo'yicha birlashtiriladi
+    # va birinchi k tasi olinadi (qolgan slotlar hisoblanmaydi ham).
+    schedule_q = (select(DoctorSchedule.doctor_id, DoctorSchedule.weekday, DoctorSchedule.start_time,
+                         DoctorSchedule.end_time)
+                  .join(User, User.id == DoctorSchedule.doctor_id)
+                  .where(User.specialty_id == specialty_id, User.role == Role.doctor))
+    schedules = await _grouped(db, schedule_q)
+    if not schedules:
+        return []
+    room_ids = None
+    if branch_id is not None:
+        room_q = (select(Room.id).join(Section, Section.id == Room.section_id)
+                  .where(Section.branch_id == branch_id).order_by(Room.id))
+        room_ids = list((await db.execute(room_q)).scalars())
+        if not room_ids:
+            return []
+
+    # Eng erta slotlar odatda birinchi kunlarda: oraliq 1, 2, 4... kunga kengaytiriladi, shunda
+    # yuzlab shifokorning butun davrdagi uchrashuvlari o'qilmaydi. Slotlar bir xil uzunlikda, shuning
+    # uchun qisqa oraliqda topilgan k ta slot butun davr uchun ham eng ertasi.
+    days = 1
+    while True:
+        horizon = min(end, start + timedelta(days=days))
+        result = await _earliest_in(db, schedules, room_ids, start, horizon, minutes, k)
+        if len(result) == k or horizon == end:
+            return result
+        days *= 2
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bo'sh vaqtlarni hisoblash narxi (DB siz)")
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--appointments', type=int, default=150)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    start = datetime(2026, 1, 5)
+    end = start + timedelta(days=args.days)
+    templates = [(d, time(9), time(13)) for d in WEEKDAYS[:6]] + [(d, time(14), time(18)) for d in WEEKDAYS[:5]]
+    starts = [start + timedelta(days=i // 9 % args.days, hours=9 + i % 9) for i in range(args.appointments)]
+    busy = [(s, s + timedelta(minutes=20)) for s in starts]
+    started = timer.perf_counter()
+    for _ in range(args.repeat):
+        slots = split(subtract(expand(templates, start, end), merge(busy)), 30, not_before=start)
+    elapsed = (timer.perf_counter() - started) / args.repeat * 1000
+    print(f"{args.days} kun, {len(busy)} uchrashuv -> {len(slots)} slot: {elapsed:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,370 @@
+# Uchrashuv band qilish va ko'chirish. Barcha shartlar bitta INSERT ... SELECT ... WHERE (ko'chirishda
+# UPDATE ... WHERE) ichida tekshiriladi:
+#   - shifokor, xona, bemor shu oraliqda band emas ((resurs, start_at) indekslarida diapazon)
+#   - xona yopiq emas (room_closure (room_id, closed_to) indeksi)
+#   - oraliq shifokorning shu kungi jadval oynasi ichida
+# Shart bajarilmasa qator qo'shilmaydi (RETURNING bo'sh) va sababi bitta so'rov bilan aniqlanadi (409).
+# Bir vaqtdagi so'rovlar ketma-ket bajariladi: SQLite da BEGIN IMMEDIATE (yozish lock i tekshiruvdan
+# oldin olinadi), Postgres da resurslar bo'yicha pg_advisory_xact_lock - jadval butunlay lock qilinmaydi.
+#   python -m app.api.booking --requests 300   # POST/PATCH route tekshiruvi va bir slot uchun parallel
+#                                              # so'rovlar: faqat bittasi o'tishi kerak
+#   python -m app.api.booking --pipeline --requests 500   # write pipeline siz/bilan o'tkazuvchanlik va latency
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+from datetime import datetime, time, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import and_, exists, func, insert, literal, select, update
+from sqlalchemy.orm import aliased
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.availability import WEEKDAYS, closing, overlapping
+from app.api.exceptions import BookingConflict
+from app.core.config import get_settings
+from app.models import Appointment, DoctorSchedule, RoomClosure
+from app.models.enums import AppointmentStatus
+from app.schema.appointment import AppointmentCreate, AppointmentUpdate
+
+settings = get_settings()
+
+# pg_advisory_xact_lock(sinf, id): har doim shu tartibda olinadi (deadlock bo'lmasligi uchun)
+LOCK_DOCTOR, LOCK_ROOM, LOCK_PATIENT = 1, 2, 3
+
+
+# PATCH da shu maydonlar o'zgarsa, yangi holat create dagi shartlar bilan tekshiriladi
+BOOKING_FIELDS = {'doctor_id', 'patient_id', 'room_id', 'start_at', 'end_at'}
+
+
+def _conditions(payload: AppointmentCreate, exclude_id: int | None = None) -> dict:
+    start, end = payload.start_at, payload.end_at
+    # Alias: UPDATE appointment ichidagi subquery tashqi jadvalga correlate bo'lib qolmasligi uchun
+    other = aliased(Appointment)
+    busy = overlapping(start, end, other)
+    if exclude_id is not None:
+        busy.append(other.id != exclude_id)
+    in_schedule = exists().where(DoctorSchedule.doctor_id == payload.doctor_id,
+                                 DoctorSchedule.weekday == WEEKDAYS[start.weekday()],
+                                 DoctorSchedule.start_time <= start.time(),
+                                 DoctorSchedule.end_time >= end.time())
+    return {
+        "Outside of the doctor's schedule": in_schedule,
+        "Room is closed at this time": ~exists().where(RoomClosure.room_id == payload.room_id, *closing(start, end)),
+        "Doctor is already booked at this time": ~exists().where(other.doctor_id == payload.doctor_id, *busy),
+        "Room is already booked at this time": ~exists().where(other.room_id == payload.room_id, *busy),
+        "Patient already has an appointment at this time": ~exists().where(other.patient_id == payload.patient_id,
+                                                                           *busy),
+    }
+
+
+def _validate(payload: AppointmentCreate) -> AppointmentCreate:
+    # Jadval vaqtlari mahalliy (time), shuning uchun tz berilgan bo'lsa ham devor soati olinadi
+    payload = payload.model_copy(update={'start_at': payload.start_at.replace(tzinfo=None),
+                                         'end_at': payload.end_at.replace(tzinfo=None)})
+    if payload.end_at <= payload.start_at:
+        raise HTTPException(400, "end_at must be after start_at")
+    if payload.end_at - payload.start_at > timedelta(minutes=settings.MAX_APPOINTMENT_MINUTES):
+        raise HTTPException(400, f"Appointment is limited to {settings.MAX_APPOINTMENT_MINUTES} minutes")
+    if payload.end_at.date() != payload.start_at.date():
+        raise BookingConflict("Outside of the doctor's schedule")
+    return payload
+
+
+async def _begin(session: AsyncSession) -> None:
+    # Write pipeline batchi allaqachon BEGIN IMMEDIATE bilan ochilgan
+    if session.bind.dialect.name == 'sqlite' and not session.in_transaction():
+        await session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+
+
+async def _lock(session: AsyncSession, payload: AppointmentCreate) -> None:
+    if session.bind.dialect.name == 'postgresql':
+        await session.execute(select(func.pg_advisory_xact_lock(LOCK_DOCTOR, payload.doctor_id),
+                                     func.pg_advisory_xact_lock(LOCK_ROOM, payload.room_id),
+                                     func.pg_advisory_xact_lock(LOCK_PATIENT, payload.patient_id)))
+    else:
+        await _begin(session)
+
+
+async def _conflict(session: AsyncSession, conditions: dict) -> BookingConflict:
+    flags = (await session.exec(select(*conditions.values()))).one()
+    reason = next((message for message, ok in zip(conditions, flags) if not ok), None)
+    return BookingConflict(reason or "Slot is no longer available")
+
+
+async def book_appointment(session: AsyncSession, payload: AppointmentCreate) -> Appointment:
+    payload = _validate(payload)
+    conditions = _conditions(payload)
+    values = {
+        'doctor_id': payload.doctor_id,
+        'patient_id': payload.patient_id,
+        'room_id': payload.room_id,
+        'start_at': payload.start_at,
+        'end_at': payload.end_at,
+        'status': AppointmentStatus.pending,
+        'note': payload.note,
+    }
+    columns = [getattr(Appointment, name) for name in values]
+    source = select(*(literal(v, c.type) for v, c in zip(values.values(), columns))).where(and_(*conditions.values()))
+    stmt = insert(Appointment).from_select(columns, source).returning(Appointment)
+
+    await _lock(session, payload)
+    obj = (await session.scalars(stmt)).first()
+    if obj is None:
+        raise await _conflict(session, conditions)
+    return obj
+
+
+async def reschedule_appointment(session: AsyncSession, appointment_id: int,
+                                 changes: AppointmentUpdate) -> Appointment:
+    # SQLite: IMMEDIATE qatorni o'qishdan oldin - o'qilgan holat UPDATE gacha o'zgarmaydi
+    await _begin(session)
+    obj = await session.get(Appointment, appointment_id)
+    if not obj:
+        raise HTTPException(404, "Appointment not found")
+    data = changes.model_dump(exclude_unset=True)
+    if not data.keys() & BOOKING_FIELDS:
+        for k, v in data.items():
+            setattr(obj, k, v)
+        session.add(obj)
+        return obj
+
+    current = {name: getattr(obj, name) for name in BOOKING_FIELDS | {'note'}}
+    payload = _validate(AppointmentCreate(**{**current, **data}))
+    conditions = _conditions(payload, exclude_id=appointment_id)
+    values = {name: getattr(payload, name) for name in data.keys() & (BOOKING_FIELDS | {'note'})}
+    stmt = (update(Appointment).where(Appointment.id == appointment_id, *conditions.values())
+            .values(**values).returning(Appointment)
+            .execution_options(synchronize_session=False, populate_existing=True))
+
+    await _lock(session, payload)
+    updated = (await session.scalars(stmt)).first()
+    if updated is None:
+        raise await _conflict(session, conditions)
+    return updated
+
+
+async def change_appointment_status(session: AsyncSession, appointment_id: int, new_status: AppointmentStatus,
+                                    note: str | None = None) -> Appointment:
+    # Bekor qilingan uchrashuvning sloti overlapping() da hisobga olinmaydi va boshqaga berilgan bo'lishi
+    # mumkin: qayta tiklash create dagi shartlar bilan bitta UPDATE ... WHERE da tekshiriladi
+    await _begin(session)
+    obj = await session.get(Appointment, appointment_id)
+    if not obj:
+        raise HTTPException(404, "Appointment not found")
+
+    old = obj.status
+    if old == new_status:
+        return obj
+    values = {'status': new_status}
+    if note:
+        values['note'] = (obj.note + "\n" if obj.note else "") + f"[status] {note}"
+    # Agar DB trigger ulangan bo‘lsa, history row avtomatik tushadi.
+    # Trigger bo'lmasa, shu yerda qo‘shing:
+    # session.add(AppointmentStatusHistory(appointment_id=appointment_id, old_status=old, new_status=new_status))
+
+    if old == AppointmentStatus.cancelled:
+        payload = AppointmentCreate(**{name: getattr(obj, name) for name in BOOKING_FIELDS})
+        conditions = _conditions(payload, exclude_id=appointment_id)
+        stmt = (update(Appointment).where(Appointment.id == appointment_id, *conditions.values())
+                .values(**values).returning(Appointment)
+                .execution_options(synchronize_session=False, populate_existing=True))
+        await _lock(session, payload)
+        restored = (await session.scalars(stmt)).first()
+        if restored is None:
+            raise await _conflict(session, conditions)
+        return restored
+
+    for k, v in values.items():
+        setattr(obj, k, v)
+    session.add(obj)
+    return obj
+
+
+# Tekshiruvlardagi slot: dushanba 10:00
+SLOT = datetime(2026, 1, 5, 10)
+
+
+async def _seed(requests: int):
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from sqlmodel import SQLModel
+
+    from app.db.session import build_engine
+    from app.models import Branch, Role, Room, Section, User
+
+    path = os.path.join(tempfile.mkdtemp(), 'booking.db')
+    engine = build_engine(f'sqlite:///{path}')
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with factory() as db:
+        db.add(Branch(id=1, name='B', address='-'))
+        db.add(Section(id=1, name='S', branch_id=1))
+        db.add(Room(id=1, floor=1, door_number=1, section_id=1))
+        db.add(User(id=1, email='doctor@example.com', password='-', full_name='D', phone='0', role=Role.doctor))
+        for i in range(requests):
+            db.add(User(id=i + 2, email=f'p{i}@example.com', password='-', full_name='P', phone=str(i)))
+        db.add(DoctorSchedule(doctor_id=1, weekday=WEEKDAYS[SLOT.weekday()], start_time=time(9), end_time=time(17)))
+        await db.commit()
+    return engine, factory
+
+
+async def _route_check(factory) -> int:
+    # POST/PATCH route orqali: response_model, run_write va reschedule_appointment birga
+    import httpx
+
+    from app.db.session import get_session
+    from app.main import app
+
+    if settings.WRITE_PIPELINE_ENABLED:
+        print("route tekshiruvi o'tkazib yuborildi: WRITE_PIPELINE_ENABLED (pipeline asosiy bazaga yozadi)")
+        return 0
+
+    async def session_override():
+        async with factory() as session:
+            yield session
+
+    def at(minutes: int) -> str:
+        return (SLOT + timedelta(minutes=minutes)).isoformat()
+
+    app.dependency_overrides[get_session] = session_override
+    failed = 0
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test/api/v1') as client:
+            first = await client.post('/appointments', json={'doctor_id': 1, 'patient_id': 2, 'room_id': 1,
+                                                             'start_at': at(0), 'end_at': at(30)})
+            second = await client.post('/appointments', json={'doctor_id': 1, 'patient_id': 3, 'room_id': 1,
+                                                              'start_at': at(60), 'end_at': at(90)})
+            checks = [("POST note siz -> 201, note null", first, 201),
+                      ("POST ikkinchi uchrashuv -> 201", second, 201)]
+            if first.status_code == 201 and second.status_code == 201:
+                url = f"/appointments/{second.json()['id']}"
+                checks += [
+                    ("PATCH 24 soat -> 400", await client.patch(url, json={'end_at': at(24 * 60)}), 400),
+                    ("PATCH band vaqtga -> 409", await client.patch(url, json={'start_at': at(15), 'end_at': at(45)}),
+                     409),
+                    ("PATCH jadvaldan tashqari -> 409", await client.patch(url, json={'start_at': at(8 * 60),
+                                                                                      'end_at': at(8 * 60 + 30)}), 409),
+                    ("PATCH o'z vaqtiga yaqin -> 200", await client.patch(url, json={'start_at': at(75),
+                                                                                     'end_at': at(105)}), 200),
+                    ("PATCH faqat note -> 200", await client.patch(url, json={'note': 'x'}), 200),
+                ]
+                # Bekor qilingan slot boshqaga berilgach, eskisini qayta tiklab bo'lmaydi
+                status_url = f"/appointments/{first.json()['id']}/status"
+                checks += [
+                    ("status cancelled -> 200", await client.post(status_url, params={'new_status': 'cancelled'}),
+                     200),
+                    ("POST bo'shagan slotga -> 201", await client.post('/appointments', json={
+                        'doctor_id': 1, 'patient_id': 4, 'room_id': 1, 'start_at': at(0), 'end_at': at(30)}), 201),
+                    ("status cancelled -> pending, slot band -> 409",
+                     await client.post(status_url, params={'new_status': 'pending'}), 409),
+                ]
+            for name, response, expected in checks:
+                ok = response.status_code == expected
+                if name.startswith("POST note") and ok:
+                    ok = response.json()['note'] is None
+                failed += not ok
+                print(f"{'ok ' if ok else 'XATO'} {name}: {response.status_code} {'' if ok else response.text}")
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+    return 1 if failed else 0
+
+
+async def _concurrency_check(factory, requests: int) -> int:
+    async def attempt(patient_id: int):
+        payload = AppointmentCreate(doctor_id=1, patient_id=patient_id, room_id=1,
+                                    start_at=SLOT, end_at=SLOT + timedelta(minutes=30))
+        async with factory() as db:
+            try:
+                await book_appointment(db, payload)
+                await db.commit()
+                return 'booked'
+            except BookingConflict:
+                return 'conflict'
+
+    results = await asyncio.gather(*(attempt(i + 2) for i in range(requests)), return_exceptions=True)
+    async with factory() as db:
+        stored = await db.scalar(select(func.count()).select_from(Appointment))
+
+    booked = results.count('booked')
+    print(f"{requests} parallel so'rov: {booked} band qilindi, {results.count('conflict')} ta 409, "
+          f"{sum(isinstance(r, Exception) for r in results)} ta xato, bazada {stored} ta uchrashuv")
+    return 0 if booked == 1 and stored == 1 else 1
+
+
+async def _pipeline_bench(requests: int) -> int:
+    # Bir-biriga xalaqit bermaydigan bandlar (har biri boshqa dushanbada, boshqa bemor): har biri o'z
+    # commiti bilan (run_write pipeline siz) va WritePipeline orqali (bitta COMMIT da guruhlab)
+    from app.db.write_pipeline import WritePipeline
+
+    print(f"{requests} parallel band qilish, WRITE_PIPELINE_WINDOW_MS={settings.WRITE_PIPELINE_WINDOW_MS:g}, "
+          f"WRITE_PIPELINE_MAX_BATCH={settings.WRITE_PIPELINE_MAX_BATCH}, {settings.SQLITE_PRAGMA_PROFILE} profil (ms)")
+    print(f"{'pipeline':<10}{'band/s':>10}{'p50':>10}{'p99':>10}{'band':>7}{'xato':>7}{'batch':>7}")
+    failed = 0
+    for enabled in (False, True):
+        engine, factory = await _seed(requests)
+        pipeline = WritePipeline(factory, window_ms=settings.WRITE_PIPELINE_WINDOW_MS,
+                                 max_batch=settings.WRITE_PIPELINE_MAX_BATCH)
+        if enabled:
+            await pipeline.start()
+        timings = []
+
+        async def attempt(i: int):
+            begin = SLOT + timedelta(weeks=i)
+            payload = AppointmentCreate(doctor_id=1, patient_id=i + 2, room_id=1,
+                                        start_at=begin, end_at=begin + timedelta(minutes=30))
+            started = asyncio.get_running_loop().time()
+            if enabled:
+                await pipeline.submit(lambda session: book_appointment(session, payload))
+            else:
+                async with factory() as db:
+                    await book_appointment(db, payload)
+                    await db.commit()
+            timings.append((asyncio.get_running_loop().time() - started) * 1000)
+
+        started = asyncio.get_running_loop().time()
+        results = await asyncio.gather(*(attempt(i) for i in range(requests)), return_exceptions=True)
+        elapsed = asyncio.get_running_loop().time() - started
+        await pipeline.stop()
+        async with factory() as db:
+            stored = await db.scalar(select(func.count()).select_from(Appointment))
+        await engine.dispose()
+
+        errors = sum(isinstance(r, Exception) for r in results)
+        p99 = statistics.quantiles(timings, n=100)[98] if len(timings) > 1 else float('nan')
+        print(f"{'on' if enabled else 'off':<10}{len(timings) / elapsed:>10.0f}{statistics.median(timings):>10.2f}"
+              f"{p99:>10.2f}{stored:>7}{errors:>7}{pipeline.batches if enabled else stored:>7}")
+        failed |= stored != requests
+    return 1 if failed else 0
+
+
+async def _check(requests: int) -> int:
+    # Har bir tekshiruv o'z vaqtinchalik bazasida
+    engine, factory = await _seed(max(requests, 3))
+    try:
+        failed = await _route_check(factory)
+    finally:
+        await engine.dispose()
+    engine, factory = await _seed(requests)
+    try:
+        failed |= await _concurrency_check(factory, requests)
+    finally:
+        await engine.dispose()
+    return failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Band qilish routelari va bitta slotga parallel band qilish "
+                                                 "(vaqtinchalik SQLite baza)")
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--pipeline', action='store_true', help="write pipeline siz va bilan band qilish benchmarki")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_pipeline_bench(args.requests) if args.pipeline else _check(args.requests)))
+
+
+if __name__ == '__main__':
+    main()
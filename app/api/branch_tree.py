@@ -0,0 +1,64 @@
+# Klinika xaritasi: filial -> bo'limlar -> xonalar. Daraxt ko'pi bilan uchta set-based so'rov bilan
+# quriladi (Branch.sections / Section.rooms lazy load qilinmaydi - N+1 yo'q) va tayyor JSON sifatida
+# keshlanadi. Kesh kalitida branch/section/room versiyalari bor (app/db/table_versions): shu
+# routerlardagi har qanday yozish versiyani oshiradi va eski daraxt barcha workerlarda ishlatilmay qoladi.
+# Daraxt faqat primary sessiyadan quriladi: orqada qolgan replicadan o'qilgan daraxt yangi versiya
+# kaliti ostida TREE_CACHE_TTL davomida keshda qolib ketardi.
+from collections import defaultdict
+
+from pydantic_core import to_json
+from sqlalchemy import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.db.table_versions import get_versions
+from app.models.branch import Branch, Room, Section
+from app.schema.branch import BranchOut, RoomOut, SectionOut
+
+settings = get_settings()
+
+# (versiyalar, branch_id | None) -> JSON baytlar
+tree_cache = TTLCache(maxsize=settings.TREE_CACHE_SIZE, ttl=settings.TREE_CACHE_TTL)
+
+
+def _columns(model, schema):
+    return [getattr(model, n) for n in schema.model_fields]
+
+
+async def _build(db: AsyncSession, branch_id: int | None) -> list[dict] | None:
+    branch_q = select(*_columns(Branch, BranchOut)).order_by(Branch.id)
+    section_q = select(*_columns(Section, SectionOut)).order_by(Section.id)
+    room_q = select(*_columns(Room, RoomOut)).order_by(Room.id)
+    if branch_id is not None:
+        branch_q = branch_q.where(Branch.id == branch_id)
+        section_q = section_q.where(Section.branch_id == branch_id)
+        room_q = room_q.where(Room.section_id.in_(select(Section.id).where(Section.branch_id == branch_id)))
+
+    branches = [dict(r._mapping) for r in await db.execute(branch_q)]
+    if not branches:
+        return None if branch_id is not None else []
+    rooms = defaultdict(list)
+    for r in await db.execute(room_q):
+        rooms[r.section_id].append(dict(r._mapping))
+    sections = defaultdict(list)
+    for r in await db.execute(section_q):
+        sections[r.branch_id].append({**r._mapping, 'rooms': rooms[r.id]})
+    for branch in branches:
+        branch['sections'] = sections[branch['id']]
+    return branches
+
+
+async def branch_tree(db: AsyncSession, branch_id: int | None = None) -> bytes | None:
+    # Versiyalar so'rovlardan oldin o'qiladi: qurish paytida yozish bo'lsa, natija eski kalit
+    # ostida qoladi va keyingi so'rov yangi kalit bilan qayta quradi
+    key = (get_versions(Branch, Section, Room), branch_id)
+    body = tree_cache.get(key)
+    if body is not None:
+        return body
+    tree = await _build(db, branch_id)
+    if tree is None:
+        return None
+    body = to_json(tree if branch_id is None else tree[0])
+    tree_cache.set(key, body)
+    return body
@@ -0,0 +1,29 @@
+# Ma'lumotnoma jadvallari (filial, bo'lim, xona, mutaxassislik, jadval) uchun conditional GET.
+# ETag - jadval versiyasi (app/db/table_versions); If-None-Match mos kelsa endpoint ishga
+# tushmasdan (bitta ham SQL so'rovsiz) 304 qaytadi. Query parametrlari URL ning qismi,
+# shuning uchun klient keshi ularni alohida saqlaydi - ETag ga qo'shish shart emas.
+# Bu routelar replica emas, primary dan o'qiydi (get_session): versiya primary commitidan keyin
+# oshadi, orqada qolgan replica eski ma'lumotni yangi ETag bilan berib qo'ysa, klient keyingi
+# yozishgacha 304 bilan eski javobda qolib ketadi. 304 yo'li DB ga umuman tegmaydi.
+from fastapi import Depends, HTTPException, Request, Response
+
+from app.db.table_versions import get_versions
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == '*':
+        return True
+    return etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+
+
+def conditional_get(*models):
+    async def dependency(request: Request, response: Response):
+        etag = f'"{get_versions(*models)}"'
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(304, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+        response.headers['ETag'] = etag
+        # Klient saqlaydi, lekin har safar ETag bilan qayta tekshiradi
+        response.headers['Cache-Control'] = 'no-cache'
+
+    return Depends(dependency)
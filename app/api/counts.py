@@ -0,0 +1,66 @@
+# Ro'yxatlar uchun ixtiyoriy umumiy son (X-Total-Count). Sahifa so'rovi hech qachon
+# butun jadvalni COUNT(*) qilmaydi:
+#   filtrlangan  - LIMIT COUNT_EXACT_LIMIT+1 bilan cheklangan aniq son (oshsa taxminiy)
+#   filtrsiz     - jadval hajmi bahosi (SQLite: max(id), Postgres: pg_class.reltuples);
+#                  kichik jadval aniq sanaladi. Natija keshlanadi, create/delete handlerlar
+#                  invalidate_count() bilan tozalaydi.
+from fastapi import Response
+from sqlalchemy import func, text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+
+settings = get_settings()
+
+TOTAL_COUNT_HEADER = 'X-Total-Count'
+TOTAL_COUNT_EXACT_HEADER = 'X-Total-Count-Exact'
+
+# jadval nomi -> (son, aniqmi)
+count_cache = TTLCache(maxsize=64, ttl=settings.COUNT_CACHE_TTL)
+
+
+async def _estimate(db: AsyncSession, model) -> int:
+    if db.bind.dialect.name == 'postgresql':
+        sql = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)")
+        estimate = (await db.execute(sql, {'t': model.__tablename__})).scalar()
+        if estimate is not None and estimate >= 0:
+            return estimate
+    # PK bo'yicha O(log n); o'chirilgan qatorlar hisobga olinmaydi, shuning uchun yuqoridan baho
+    return (await db.execute(select(func.max(model.id)))).scalar() or 0
+
+
+async def table_count(db: AsyncSession, model) -> tuple[int, bool]:
+    key = model.__tablename__
+    cached = count_cache.get(key)
+    if cached is not None:
+        return cached
+    estimate = await _estimate(db, model)
+    if estimate <= settings.COUNT_EXACT_LIMIT:
+        result = ((await db.execute(select(func.count()).select_from(model))).scalar_one(), True)
+    else:
+        result = (estimate, False)
+    count_cache.set(key, result)
+    return result
+
+
+async def filtered_count(db: AsyncSession, q, model) -> tuple[int, bool]:
+    limit = settings.COUNT_EXACT_LIMIT
+    sub = q.with_only_columns(model.id).order_by(None).limit(limit + 1).subquery()
+    count = (await db.execute(select(func.count()).select_from(sub))).scalar_one()
+    return (limit, False) if count > limit else (count, True)
+
+
+async def set_total_count(db: AsyncSession, response: Response, q, model) -> None:
+    if q.whereclause is None:
+        total, exact = await table_count(db, model)
+    else:
+        total, exact = await filtered_count(db, q, model)
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    if not exact:
+        response.headers[TOTAL_COUNT_EXACT_HEADER] = 'false'
+
+
+def invalidate_count(model) -> None:
+    count_cache.invalidate(model.__tablename__)
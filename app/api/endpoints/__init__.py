@@ -7,3 +7,7 @@ from app.api.endpoints.payments import router as payments_router
 from app.api.endpoints.specialties import router as specialties_router
 from app.api.endpoints.schedules import router as schedules_router
 from app.api.endpoints.auth import auth_route
+from app.api.endpoints.doctors import router as doctors_router
+from app.api.endpoints.availability import router as availability_router
+from app.api.endpoints.diagnostics import router as diagnostics_router
+from app.api.endpoints.well_known import router as well_known_router
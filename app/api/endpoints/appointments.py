@@ -1,8 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
-from sqlmodel import Session, select
+from datetime import datetime
 
-from app.db.session import get_session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.booking import book_appointment, change_appointment_status, reschedule_appointment
+from app.api.counts import invalidate_count
+from app.api.export import ExportFormat, export_response
+from app.api.fields import FIELDS_QUERY, parse_fields, project, rows_response, row_response, get_projected
+from app.api.pagination import paginate
+from app.api.serialization import serialize
+from app.db.session import get_session, get_read_session
+from app.db.write_pipeline import run_write
 from app.models import Appointment, AppointmentStatusHistory
 from app.models.enums import AppointmentStatus
 from app.schema.appointment import AppointmentOut, AppointmentCreate, AppointmentUpdate
@@ -10,15 +20,8 @@ from app.schema.appointment import AppointmentOut, AppointmentCreate, Appointmen
 router = APIRouter(prefix="/appointments", tags=["appointments"])
 
 
-@router.get("", response_model=List[AppointmentOut])
-def list_appointments(
-        db: Session = Depends(get_session),
-        doctor_id: int | None = None,
-        patient_id: int | None = None,
-        status: Optional[AppointmentStatus] = None,
-        limit: int = Query(100, ge=1, le=500),
-        offset: int = Query(0, ge=0),
-):
+def list_query(doctor_id: int | None = None, patient_id: int | None = None,
+               status: AppointmentStatus | None = None):
     q = select(Appointment)
     if doctor_id is not None:
         q = q.where(Appointment.doctor_id == doctor_id)
@@ -26,75 +29,115 @@ def list_appointments(
         q = q.where(Appointment.patient_id == patient_id)
     if status is not None:
         q = q.where(Appointment.status == status)
-    return db.exec(q.offset(offset).limit(limit)).all()
+    return q
+
+
+def history_query(appointment_id: int):
+    q = select(AppointmentStatusHistory).where(AppointmentStatusHistory.appointment_id == appointment_id)
+    return q.order_by(AppointmentStatusHistory.changed_at)
+
+
+@router.get("", response_model=List[AppointmentOut])
+async def list_appointments(
+        response: Response,
+        db: AsyncSession = Depends(get_read_session),
+        doctor_id: int | None = None,
+        patient_id: int | None = None,
+        status: Optional[AppointmentStatus] = None,
+        limit: int = Query(100, ge=1, le=500),
+        cursor: str | None = None,
+        with_total: bool = False,
+        fields: str | None = FIELDS_QUERY,
+        offset: int | None = Query(None, ge=0, deprecated=True),
+):
+    names = parse_fields(fields, AppointmentOut)
+    keys = [Appointment.start_at, Appointment.id]
+    q = list_query(doctor_id, patient_id, status)
+    if names:
+        q = project(q, Appointment, names, keys)
+    rows = await paginate(db, q, keys, response, limit=limit, cursor=cursor, offset=offset,
+                          with_total=with_total)
+    return rows_response(rows, names, response) if names else serialize(rows, AppointmentOut, response)
+
+
+@router.get("/export")
+async def export_appointments(
+        request: Request,
+        doctor_id: int | None = None,
+        patient_id: int | None = None,
+        status: Optional[AppointmentStatus] = None,
+        date_from: datetime | None = Query(None, description="start_at >= date_from"),
+        date_to: datetime | None = Query(None, description="start_at < date_to"),
+        fmt: ExportFormat = Query('ndjson', alias='format'),
+        fields: str | None = FIELDS_QUERY,
+):
+    names = parse_fields(fields, AppointmentOut) or list(AppointmentOut.model_fields)
+    q = project(list_query(doctor_id, patient_id, status), Appointment, names)
+    if date_from is not None:
+        q = q.where(Appointment.start_at >= date_from)
+    if date_to is not None:
+        q = q.where(Appointment.start_at < date_to)
+    q = q.order_by(Appointment.start_at, Appointment.id)
+    return export_response(request, q, names, fmt, 'appointments')
 
 
 @router.get("/{appointment_id}", response_model=AppointmentOut)
-def get_appointment(appointment_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Appointment, appointment_id)
+async def get_appointment(appointment_id: int, fields: str | None = FIELDS_QUERY,
+                          db: AsyncSession = Depends(get_read_session)):
+    names = parse_fields(fields, AppointmentOut)
+    if names:
+        obj = await get_projected(db, Appointment, appointment_id, names)
+    else:
+        obj = await db.get(Appointment, appointment_id)
     if not obj:
         raise HTTPException(404, "Appointment not found")
-    return obj
+    return row_response(obj, names) if names else obj
 
 
 @router.post("", response_model=AppointmentOut, status_code=201)
-def create_appointment(payload: AppointmentCreate, db: Session = Depends(get_session)):
-    db.add(payload)
-    db.commit()
-    db.refresh(payload)
-    return payload
+async def create_appointment(payload: AppointmentCreate, db: AsyncSession = Depends(get_session)):
+    # Bandlik, xona yopilishi va jadval tekshiruvi bitta INSERT ... SELECT da (app/api/booking.py)
+    async def op(session: AsyncSession):
+        return await book_appointment(session, payload)
+
+    obj = await run_write(db, op)
+    invalidate_count(Appointment)
+    return obj
 
 
 @router.patch("/{appointment_id}", response_model=AppointmentOut)
-def update_appointment(appointment_id: int, payload: AppointmentUpdate, db: Session = Depends(get_session)):
-    obj = db.get(Appointment, appointment_id)
-    if not obj:
-        raise HTTPException(404, "Appointment not found")
-    for k, v in payload.dict(exclude_unset=True).items():
-        setattr(obj, k, v)
-    db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return obj
+async def update_appointment(appointment_id: int, payload: AppointmentUpdate, db: AsyncSession = Depends(get_session)):
+    # Vaqt yoki resurs o'zgarsa create dagi shartlar bitta UPDATE ... WHERE da tekshiriladi
+    async def op(session: AsyncSession):
+        return await reschedule_appointment(session, appointment_id, payload)
+
+    return await run_write(db, op)
 
 
 @router.delete("/{appointment_id}", status_code=204)
-def delete_appointment(appointment_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Appointment, appointment_id)
-    if not obj:
-        raise HTTPException(404, "Appointment not found")
-    db.delete(obj)
-    db.commit()
+async def delete_appointment(appointment_id: int, db: AsyncSession = Depends(get_session)):
+    async def op(session: AsyncSession):
+        obj = await session.get(Appointment, appointment_id)
+        if not obj:
+            raise HTTPException(404, "Appointment not found")
+        await session.delete(obj)
+
+    await run_write(db, op)
+    invalidate_count(Appointment)
 
 
 # --- Status history ---
 
 @router.get("/{appointment_id}/history", response_model=List[AppointmentStatusHistory])
-def get_history(appointment_id: int, db: Session = Depends(get_session)):
-    q = select(AppointmentStatusHistory).where(AppointmentStatusHistory.appointment_id == appointment_id)
-    return db.exec(q.order_by(AppointmentStatusHistory.changed_at)).all()
+async def get_history(appointment_id: int, db: AsyncSession = Depends(get_read_session)):
+    return (await db.exec(history_query(appointment_id))).all()
 
 
 @router.post("/{appointment_id}/status", response_model=Appointment)
-def change_status(appointment_id: int, new_status: AppointmentStatus, note: str | None = None,
-                  db: Session = Depends(get_session)):
-    obj = db.get(Appointment, appointment_id)
-    if not obj:
-        raise HTTPException(404, "Appointment not found")
+async def change_status(appointment_id: int, new_status: AppointmentStatus, note: str | None = None,
+                        db: AsyncSession = Depends(get_session)):
+    # cancelled -> boshqa status: slot bo'shligi create dagi shartlar bilan tekshiriladi (app/api/booking.py)
+    async def op(session: AsyncSession):
+        return await change_appointment_status(session, appointment_id, new_status, note)
 
-    old = obj.status
-    if old == new_status:
-        return obj
-
-    obj.status = new_status
-    if note:
-        obj.note = (obj.note + "\n" if obj.note else "") + f"[status] {note}"
-
-    db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    # Agar DB trigger ulangan bo‘lsa, history row avtomatik tushadi.
-    # Trigger bo'lmasa, shu yerda qo‘shing:
-    # db.add(AppointmentStatusHistory(appointment_id=appointment_id, old_status=old, new_status=new_status))
-    # db.commit()
-    return obj
+    return await run_write(db, op)
@@ -2,12 +2,17 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlmodel import select, Session
-
-from app.api.exceptions import InvalidToken, BlockedToken, UserNotFound
-from app.api.security_utils.password import password_hash, verify_password, create_access_token, create_token_pair, \
-    set_refresh_cookie, get_current_user, bearer_schema, decode_token, block_jti, \
-    clear_refresh_cookie, is_jti_blocked, create_refresh_token, peek_jti_and_exp
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.counts import invalidate_count
+from app.api.exceptions import InvalidToken, BlockedToken, ServiceBusy, UserNotFound
+from app.api.security_utils.password import async_password_hash, async_verify_password, create_access_token, \
+    create_token_pair, set_refresh_cookie, get_current_user, bearer_schema, decode_token, block_jti, \
+    clear_refresh_cookie, is_jti_blocked, create_refresh_token, peek_jti_and_exp, token_claims, password_needs_update, \
+    async_verify_dummy_password
+from app.api.security_utils.rate_limit import login_rate_limit, refresh_rate_limit
+from app.api.security_utils.principal_cache import invalidate_principal
 from app.db.session import get_session, settings
 from app.models import User
 from app.models.user import Role
@@ -18,9 +23,9 @@ auth_route = APIRouter()
 
 
 @auth_route.post('/register', response_model=UserOut)
-async def register(data: UserCreate, role: Role = Role.patient, session: Session = Depends(get_session)):
+async def register(data: UserCreate, role: Role = Role.patient, session: AsyncSession = Depends(get_session)):
     db_data = User.model_validate(data)
-    exists = session.exec(select(User).where(User.email == db_data.email)).first()
+    exists = (await session.exec(select(User).where(User.email == db_data.email))).first()
 
     if exists:
         raise HTTPException(status_code=400, detail=f"{db_data.email} email avval ham ro'yxatdan o'tgan")
@@ -32,24 +37,40 @@ async def register(data: UserCreate, role: Role = Role.patient, session: Session
                 email=db_data.email,
                 phone=db_data.phone,
                 role=role,
-                password=password_hash(db_data.password),
+                password=await async_password_hash(db_data.password),
                 bio=db_data.bio,
                 specialty_id=data.specialty_id if role == Role.doctor else None)
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    invalidate_count(User)
+    await session.refresh(user)
     return user
 
 
-@auth_route.post('/login', response_model=Token)
-async def login(body: LoginIn, response: Response, session: Session = Depends(get_session)):
-    user = session.exec(select(User).where(User.email == body.email)).first()
+@auth_route.post('/login', response_model=Token, dependencies=[Depends(login_rate_limit)])
+async def login(body: LoginIn, response: Response, session: AsyncSession = Depends(get_session)):
+    user = (await session.exec(select(User).where(User.email == body.email))).first()
+
+    if not user:
+        await async_verify_dummy_password(body.password)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Cridentials")
 
-    if not user or not verify_password(body.password, user.password):
+    if not await async_verify_password(body.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Invalid Cridentials")
 
-    payload = {"sub": str(user.id)}
+    # Hash cost BCRYPT_ROUNDS dan farq qilsa, to'g'ri parol qo'limizda ekan - qayta hashlaymiz.
+    # Pool to'la bo'lsa o'tkazib yuboramiz: parol tekshirilgan, login 503 bilan yiqilmasin - keyingi loginda qayta
+    if password_needs_update(user.password):
+        try:
+            user.password = await async_password_hash(body.password)
+        except ServiceBusy:
+            pass
+        else:
+            session.add(user)
+            await session.commit()
+
+    payload = token_claims(user)
 
     access_token, refresh_token = create_token_pair(data=payload)
 
@@ -79,10 +100,23 @@ async def user_logout(request: Request,
     return {"detail": "Logout Successfully!"}
 
 
-@auth_route.post("/refresh", response_model=Token)
+@auth_route.post('/logout-all')
+async def user_logout_all(response: Response,
+                          user: Annotated[User, Depends(get_current_user)],
+                          session: Annotated[AsyncSession, Depends(get_session)]):
+    # token_version ni oshiramiz: userning barcha access/refresh tokenlari bekor bo'ladi
+    await session.execute(update(User).where(User.id == user.id).values(token_version=User.token_version + 1))
+    await session.commit()
+    invalidate_principal(user.id)
+
+    clear_refresh_cookie(response)
+    return {"detail": "Logged out from all sessions!"}
+
+
+@auth_route.post("/refresh", response_model=Token, dependencies=[Depends(refresh_rate_limit)])
 async def refresh_access_token(request: Request, response: Response,
                                creds: Annotated[HTTPAuthorizationCredentials, Depends(bearer_schema)],
-                               session: Annotated[Session, Depends(get_session)]) -> Token:
+                               session: Annotated[AsyncSession, Depends(get_session)]) -> Token:
     # 0) Access tokenni block qilamiz
     if creds and creds.credentials and creds.scheme.lower() == 'bearer':
         jti, exp_ts = peek_jti_and_exp(creds.credentials)
@@ -106,17 +140,20 @@ async def refresh_access_token(request: Request, response: Response,
     except (TypeError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Bad subject")
 
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
+    if payload.get("ver", 0) != user.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token revoked")
+
     # 4) Accessni yangilash
-    access = create_access_token({"sub": str(user.id)})
+    access = create_access_token(token_claims(user))
 
     # 5) Refresh rotatsiyasi:
     # eski refresh jti ni bloklab, yangisini berish (reuse aniqlash uchun ham foydali)
     block_jti(payload.get("jti"), int(payload.get("exp", 0)))
-    new_refresh = create_refresh_token({"sub": str(user.id)})
+    new_refresh = create_refresh_token(token_claims(user))
     set_refresh_cookie(response, new_refresh)
 
     # 6) Yangi access tokenni qaytaramiz
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.availability import earliest_slots, resolve_range
+from app.db.session import get_read_session
+from app.schema.availability import DoctorSlotOut
+
+router = APIRouter(prefix="/availability", tags=["availability"])
+
+
+@router.get("/search", response_model=List[DoctorSlotOut])
+async def search_availability(specialty_id: int,
+                              branch_id: int | None = Query(None, description="Filialda bo'sh xona ham bo'lishi kerak"),
+                              date_from: datetime | None = Query(None, alias='from'),
+                              date_to: datetime | None = Query(None, alias='to'),
+                              slot: int = Query(30, ge=5, le=240, description="Slot davomiyligi, daqiqa"),
+                              k: int = Query(10, ge=1, le=100),
+                              db: AsyncSession = Depends(get_read_session)):
+    # Mutaxassislik bo'yicha barcha shifokorlarning eng erta bo'sh slotlari
+    start, end = resolve_range(date_from, date_to)
+    slots = await earliest_slots(db, specialty_id, start, end, slot, k, branch_id)
+    return [DoctorSlotOut(start_at=s, end_at=e, doctor_id=d, room_id=r) for s, e, d, r in slots]
@@ -1,60 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.api.branch_tree import branch_tree
+from app.api.conditional import conditional_get
+from app.api.counts import invalidate_count
+from app.api.fields import (FIELDS_QUERY, parse_fields, project, rows_response, row_response, get_projected,
+                            json_response)
+from app.api.pagination import paginate
+from app.api.serialization import serialize
 from app.db.session import get_session
-from app.models.branch import Branch
-from app.schema.branch import BranchOut, BranchCreate, BranchUpdate
+from app.db.table_versions import bump
+from app.models.branch import Branch, Room, Section
+from app.schema.branch import BranchOut, BranchCreate, BranchUpdate, BranchTreeOut
 from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(prefix="/branches", tags=["branches"])
 
 
-@router.get("", response_model=List[BranchOut])
-def list_branches(db: Session = Depends(get_session),
-                  limit: int = Query(100, ge=1, le=500),
-                  offset: int = Query(0, ge=0)):
-    q = select(Branch).offset(offset).limit(limit)
-    return db.exec(q).all()
+def list_query():
+    return select(Branch)
 
 
-@router.get("/{branch_id}", response_model=BranchOut)
-def get_branch(branch_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Branch, branch_id)
+@router.get("", response_model=List[BranchOut], dependencies=[conditional_get(Branch)])
+async def list_branches(response: Response,
+                        db: AsyncSession = Depends(get_session),
+                        limit: int = Query(100, ge=1, le=500),
+                        cursor: str | None = None,
+                        with_total: bool = False,
+                        fields: str | None = FIELDS_QUERY,
+                        offset: int | None = Query(None, ge=0, deprecated=True)):
+    names = parse_fields(fields, BranchOut)
+    keys = [Branch.id]
+    q = list_query()
+    if names:
+        q = project(q, Branch, names, keys)
+    rows = await paginate(db, q, keys, response, limit=limit, cursor=cursor, offset=offset,
+                          with_total=with_total)
+    return rows_response(rows, names, response) if names else serialize(rows, BranchOut, response)
+
+
+@router.get("/tree", response_model=List[BranchTreeOut], dependencies=[conditional_get(Branch, Section, Room)])
+async def get_branches_tree(response: Response, db: AsyncSession = Depends(get_session)):
+    body = await branch_tree(db)
+    return json_response(body, response)
+
+
+@router.get("/{branch_id}/tree", response_model=BranchTreeOut,
+            dependencies=[conditional_get(Branch, Section, Room)])
+async def get_branch_tree(response: Response, branch_id: int, db: AsyncSession = Depends(get_session)):
+    body = await branch_tree(db, branch_id)
+    if body is None:
+        raise HTTPException(404, "Branch not found")
+    return json_response(body, response)
+
+
+@router.get("/{branch_id}", response_model=BranchOut, dependencies=[conditional_get(Branch)])
+async def get_branch(response: Response, branch_id: int, fields: str | None = FIELDS_QUERY,
+                     db: AsyncSession = Depends(get_session)):
+    names = parse_fields(fields, BranchOut)
+    obj = await get_projected(db, Branch, branch_id, names) if names else await db.get(Branch, branch_id)
     if not obj:
         raise HTTPException(404, "Branch not found")
-    return obj
+    return row_response(obj, names, response) if names else obj
 
 
 @router.post("", response_model=BranchOut, status_code=201)
-def create_branch(payload: BranchCreate, db: Session = Depends(get_session)):
+async def create_branch(payload: BranchCreate, db: AsyncSession = Depends(get_session)):
     try:
         payload = Branch.model_validate(payload)
         db.add(payload)
-        db.commit()
-        db.refresh(payload)
+        await db.commit()
+        invalidate_count(Branch)
+        bump(Branch)
+        await db.refresh(payload)
         return payload
     except IntegrityError as e:
         raise HTTPException(status_code=400, detail=f"{e.orig}")
 
 
 @router.patch("/{branch_id}", response_model=BranchOut)
-def update_branch(branch_id: int, payload: BranchUpdate, db: Session = Depends(get_session)):
-    obj = db.get(Branch, branch_id)
+async def update_branch(branch_id: int, payload: BranchUpdate, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(Branch, branch_id)
     if not obj:
         raise HTTPException(404, "Branch not found")
     for k, v in payload.dict(exclude_unset=True).items():
         setattr(obj, k, v)
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    bump(Branch)
+    await db.refresh(obj)
     return obj
 
 
 @router.delete("/{branch_id}", status_code=204)
-def delete_branch(branch_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Branch, branch_id)
+async def delete_branch(branch_id: int, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(Branch, branch_id)
     if not obj:
         raise HTTPException(404, "Branch not found")
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
+    invalidate_count(Branch)
+    bump(Branch)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+
+from app.api.branch_tree import tree_cache
+from app.api.counts import count_cache
+from app.api.security_utils.password import verified_token_cache
+from app.api.security_utils.principal_cache import principal_cache
+from app.db.pool import pool_status
+from app.db.session import engine, read_engine
+from app.db.write_pipeline import write_pipeline
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/caches")
+async def cache_stats():
+    return {
+        'principal': principal_cache.stats(),
+        'verified_token': verified_token_cache.stats(),
+        'count': count_cache.stats(),
+        'tree': tree_cache.stats(),
+    }
+
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    status = pool_status(engine.pool)
+    if read_engine is not engine:
+        status['read'] = pool_status(read_engine.pool)
+    return status
+
+
+@router.get("/write-pipeline")
+async def write_pipeline_stats():
+    return write_pipeline.stats()
@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.availability import doctor_free_slots, resolve_range
+from app.api.serialization import serialize
+from app.db.search import search_doctor_ids
+from app.db.session import get_read_session
+from app.models import Role, User
+from app.schema.availability import SlotOut
+from app.schema.user import UserOut
+
+router = APIRouter(prefix="/doctors", tags=["doctors"])
+
+
+@router.get("/search", response_model=List[UserOut])
+async def search_doctors(response: Response,
+                         q: str = Query(..., min_length=1, max_length=100),
+                         limit: int = Query(20, ge=1, le=100),
+                         db: AsyncSession = Depends(get_read_session)):
+    # Ism, bio va mutaxassislik bo'yicha; natija relevantlik (bm25 / ts_rank) tartibida
+    ids = await search_doctor_ids(db, q, limit)
+    if not ids:
+        return []
+    users = {u.id: u for u in (await db.exec(select(User).where(User.id.in_(ids)))).all()}
+    return serialize([users[i] for i in ids if i in users], UserOut, response)
+
+
+@router.get("/{doctor_id}/availability", response_model=List[SlotOut])
+async def doctor_availability(doctor_id: int,
+                              date_from: datetime | None = Query(None, alias='from'),
+                              date_to: datetime | None = Query(None, alias='to'),
+                              slot: int = Query(30, ge=5, le=240, description="Slot davomiyligi, daqiqa"),
+                              room_id: int | None = None,
+                              db: AsyncSession = Depends(get_read_session)):
+    start, end = resolve_range(date_from, date_to)
+    doctor = await db.get(User, doctor_id)
+    if not doctor or doctor.role != Role.doctor:
+        raise HTTPException(404, "Doctor not found")
+    slots = await doctor_free_slots(db, doctor_id, start, end, slot, room_id)
+    return [SlotOut(start_at=s, end_at=e) for s, e in slots]
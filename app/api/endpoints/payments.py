@@ -1,23 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from typing import List
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db.session import get_session
+from app.api.counts import invalidate_count
+from app.api.export import ExportFormat, export_response
+from app.api.fields import FIELDS_QUERY, parse_fields, project, rows_response, row_response, get_projected
+from app.api.pagination import paginate
+from app.api.serialization import serialize
+from app.db.session import get_session, get_read_session
+from app.db.write_pipeline import run_write
 from app.models.payment import Payment
 from app.models.enums import PaymentStatus, PaymentMethod
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
 
-@router.get("", response_model=List[Payment])
-def list_payments(
-        db: Session = Depends(get_session),
-        appointment_id: int | None = None,
-        status: PaymentStatus | None = None,
-        method: PaymentMethod | None = None,
-        limit: int = Query(100, ge=1, le=500),
-        offset: int = Query(0, ge=0),
-):
+def list_query(appointment_id: int | None = None, status: PaymentStatus | None = None,
+               method: PaymentMethod | None = None):
     q = select(Payment)
     if appointment_id is not None:
         q = q.where(Payment.appointment_id == appointment_id)
@@ -25,42 +27,95 @@ def list_payments(
         q = q.where(Payment.status == status)
     if method is not None:
         q = q.where(Payment.method == method)
-    return db.exec(q.offset(offset).limit(limit)).all()
+    return q
+
+
+@router.get("", response_model=List[Payment])
+async def list_payments(
+        response: Response,
+        db: AsyncSession = Depends(get_read_session),
+        appointment_id: int | None = None,
+        status: PaymentStatus | None = None,
+        method: PaymentMethod | None = None,
+        limit: int = Query(100, ge=1, le=500),
+        cursor: str | None = None,
+        with_total: bool = False,
+        fields: str | None = FIELDS_QUERY,
+        offset: int | None = Query(None, ge=0, deprecated=True),
+):
+    names = parse_fields(fields, Payment)
+    keys = [Payment.id]
+    q = list_query(appointment_id, status, method)
+    if names:
+        q = project(q, Payment, names, keys)
+    rows = await paginate(db, q, keys, response, limit=limit, cursor=cursor, offset=offset,
+                          with_total=with_total)
+    return rows_response(rows, names, response) if names else serialize(rows, Payment, response)
+
+
+@router.get("/export")
+async def export_payments(
+        request: Request,
+        appointment_id: int | None = None,
+        status: PaymentStatus | None = None,
+        method: PaymentMethod | None = None,
+        date_from: datetime | None = Query(None, description="paid_at >= date_from"),
+        date_to: datetime | None = Query(None, description="paid_at < date_to"),
+        fmt: ExportFormat = Query('ndjson', alias='format'),
+        fields: str | None = FIELDS_QUERY,
+):
+    names = parse_fields(fields, Payment) or list(Payment.model_fields)
+    q = project(list_query(appointment_id, status, method), Payment, names)
+    if date_from is not None:
+        q = q.where(Payment.paid_at >= date_from)
+    if date_to is not None:
+        q = q.where(Payment.paid_at < date_to)
+    return export_response(request, q.order_by(Payment.id), names, fmt, 'payments')
 
 
 @router.get("/{payment_id}", response_model=Payment)
-def get_payment(payment_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Payment, payment_id)
+async def get_payment(payment_id: int, fields: str | None = FIELDS_QUERY,
+                      db: AsyncSession = Depends(get_read_session)):
+    names = parse_fields(fields, Payment)
+    obj = await get_projected(db, Payment, payment_id, names) if names else await db.get(Payment, payment_id)
     if not obj:
         raise HTTPException(404, "Payment not found")
-    return obj
+    return row_response(obj, names) if names else obj
 
 
 @router.post("", response_model=Payment, status_code=201)
-def create_payment(payload: Payment, db: Session = Depends(get_session)):
-    db.add(payload)
-    db.commit()
-    db.refresh(payload)
-    return payload
+async def create_payment(payload: Payment, db: AsyncSession = Depends(get_session)):
+    async def op(session: AsyncSession):
+        session.add(payload)
+        await session.flush()
+        return payload
+
+    obj = await run_write(db, op)
+    invalidate_count(Payment)
+    return obj
 
 
 @router.patch("/{payment_id}", response_model=Payment)
-def update_payment(payment_id: int, payload: Payment, db: Session = Depends(get_session)):
-    obj = db.get(Payment, payment_id)
-    if not obj:
-        raise HTTPException(404, "Payment not found")
-    for k, v in payload.dict(exclude_unset=True).items():
-        setattr(obj, k, v)
-    db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return obj
+async def update_payment(payment_id: int, payload: Payment, db: AsyncSession = Depends(get_session)):
+    async def op(session: AsyncSession):
+        obj = await session.get(Payment, payment_id)
+        if not obj:
+            raise HTTPException(404, "Payment not found")
+        for k, v in payload.dict(exclude_unset=True).items():
+            setattr(obj, k, v)
+        session.add(obj)
+        return obj
+
+    return await run_write(db, op)
 
 
 @router.delete("/{payment_id}", status_code=204)
-def delete_payment(payment_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Payment, payment_id)
-    if not obj:
-        raise HTTPException(404, "Payment not found")
-    db.delete(obj)
-    db.commit()
+async def delete_payment(payment_id: int, db: AsyncSession = Depends(get_session)):
+    async def op(session: AsyncSession):
+        obj = await session.get(Payment, payment_id)
+        if not obj:
+            raise HTTPException(404, "Payment not found")
+        await session.delete(obj)
+
+    await run_write(db, op)
+    invalidate_count(Payment)
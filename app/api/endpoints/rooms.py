@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.api.conditional import conditional_get
+from app.api.counts import invalidate_count
+from app.api.fields import FIELDS_QUERY, parse_fields, project, rows_response, row_response, get_projected
+from app.api.pagination import paginate
+from app.api.serialization import serialize
 from app.db.session import get_session
+from app.db.table_versions import bump
 from app.models.branch import Room
 from app.schema.branch import RoomOut, RoomCreate, RoomUpdate
 from sqlalchemy.exc import IntegrityError
@@ -10,54 +17,76 @@ from sqlalchemy.exc import IntegrityError
 router = APIRouter(prefix="/rooms", tags=["rooms"])
 
 
-@router.get("", response_model=List[RoomOut])
-def list_rooms(db: Session = Depends(get_session),
-               section_id: int | None = None,
-               limit: int = Query(100, ge=1, le=500),
-               offset: int = Query(0, ge=0)):
+def list_query(section_id: int | None = None):
     q = select(Room)
     if section_id is not None:
         q = q.where(Room.section_id == section_id)
-    return db.exec(q.offset(offset).limit(limit)).all()
+    return q
 
 
-@router.get("/{room_id}", response_model=RoomOut)
-def get_room(room_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Room, room_id)
+@router.get("", response_model=List[RoomOut], dependencies=[conditional_get(Room)])
+async def list_rooms(response: Response,
+                     db: AsyncSession = Depends(get_session),
+                     section_id: int | None = None,
+                     limit: int = Query(100, ge=1, le=500),
+                     cursor: str | None = None,
+                     with_total: bool = False,
+                     fields: str | None = FIELDS_QUERY,
+                     offset: int | None = Query(None, ge=0, deprecated=True)):
+    names = parse_fields(fields, RoomOut)
+    keys = [Room.id]
+    q = list_query(section_id)
+    if names:
+        q = project(q, Room, names, keys)
+    rows = await paginate(db, q, keys, response, limit=limit, cursor=cursor, offset=offset,
+                          with_total=with_total)
+    return rows_response(rows, names, response) if names else serialize(rows, RoomOut, response)
+
+
+@router.get("/{room_id}", response_model=RoomOut, dependencies=[conditional_get(Room)])
+async def get_room(response: Response, room_id: int, fields: str | None = FIELDS_QUERY,
+                   db: AsyncSession = Depends(get_session)):
+    names = parse_fields(fields, RoomOut)
+    obj = await get_projected(db, Room, room_id, names) if names else await db.get(Room, room_id)
     if not obj:
         raise HTTPException(404, "Room not found")
-    return obj
+    return row_response(obj, names, response) if names else obj
 
 
 @router.post("", response_model=RoomOut, status_code=201)
-def create_room(payload: RoomCreate, db: Session = Depends(get_session)):
+async def create_room(payload: RoomCreate, db: AsyncSession = Depends(get_session)):
     try:
         payload = Room.model_validate(payload)
         db.add(payload)
-        db.commit()
-        db.refresh(payload)
+        await db.commit()
+        invalidate_count(Room)
+        bump(Room)
+        await db.refresh(payload)
         return payload
     except IntegrityError as e:
         raise HTTPException(status_code=400, detail=f"{e.orig}")
 
 
 @router.patch("/{room_id}", response_model=RoomOut)
-def update_room(room_id: int, payload: RoomUpdate, db: Session = Depends(get_session)):
-    obj = db.get(Room, room_id)
+async def update_room(room_id: int, payload: RoomUpdate, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(Room, room_id)
     if not obj:
         raise HTTPException(404, "Room not found")
     for k, v in payload.dict(exclude_unset=True).items():
         setattr(obj, k, v)
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    bump(Room)
+    await db.refresh(obj)
     return obj
 
 
 @router.delete("/{room_id}", status_code=204)
-def delete_room(room_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Room, room_id)
+async def delete_room(room_id: int, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(Room, room_id)
     if not obj:
         raise HTTPException(404, "Room not found")
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
+    invalidate_count(Room)
+    bump(Room)
@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.api.conditional import conditional_get
+from app.api.counts import invalidate_count
+from app.api.fields import FIELDS_QUERY, parse_fields, project, rows_response, row_response, get_projected
+from app.api.pagination import paginate
+from app.api.serialization import serialize
 from app.db.session import get_session
+from app.db.table_versions import bump
 from app.models.schedule import DoctorSchedule
 from app.models.enums import Weekday
 from app.schema.schedule import DoctorScheduleOut, DoctorScheduleCreate, DoctorScheduleUpdate
@@ -11,57 +18,82 @@ from sqlalchemy.exc import IntegrityError
 router = APIRouter(prefix="/schedules", tags=["schedules"])
 
 
-@router.get("", response_model=List[DoctorScheduleOut])
-def list_schedules(db: Session = Depends(get_session),
-                   doctor_id: int | None = None,
-                   weekday: Weekday | None = None,
-                   limit: int = Query(100, ge=1, le=500),
-                   offset: int = Query(0, ge=0)):
+def list_query(doctor_id: int | None = None, weekday: Weekday | None = None):
     q = select(DoctorSchedule)
     if doctor_id is not None:
         q = q.where(DoctorSchedule.doctor_id == doctor_id)
     if weekday is not None:
         q = q.where(DoctorSchedule.weekday == weekday)
-    return db.exec(q.order_by('id').offset(offset).limit(limit)).all()
+    return q
 
 
-@router.get("/{schedule_id}", response_model=DoctorScheduleOut)
-def get_schedule(schedule_id: int, db: Session = Depends(get_session)):
-    obj = db.get(DoctorSchedule, schedule_id)
+@router.get("", response_model=List[DoctorScheduleOut], dependencies=[conditional_get(DoctorSchedule)])
+async def list_schedules(response: Response,
+                         db: AsyncSession = Depends(get_session),
+                         doctor_id: int | None = None,
+                         weekday: Weekday | None = None,
+                         limit: int = Query(100, ge=1, le=500),
+                         cursor: str | None = None,
+                         with_total: bool = False,
+                         fields: str | None = FIELDS_QUERY,
+                         offset: int | None = Query(None, ge=0, deprecated=True)):
+    names = parse_fields(fields, DoctorScheduleOut)
+    keys = [DoctorSchedule.id]
+    q = list_query(doctor_id, weekday)
+    if names:
+        q = project(q, DoctorSchedule, names, keys)
+    rows = await paginate(db, q, keys, response, limit=limit, cursor=cursor, offset=offset,
+                          with_total=with_total)
+    return rows_response(rows, names, response) if names else serialize(rows, DoctorScheduleOut, response)
+
+
+@router.get("/{schedule_id}", response_model=DoctorScheduleOut, dependencies=[conditional_get(DoctorSchedule)])
+async def get_schedule(response: Response, schedule_id: int, fields: str | None = FIELDS_QUERY,
+                       db: AsyncSession = Depends(get_session)):
+    names = parse_fields(fields, DoctorScheduleOut)
+    if names:
+        obj = await get_projected(db, DoctorSchedule, schedule_id, names)
+    else:
+        obj = await db.get(DoctorSchedule, schedule_id)
     if not obj:
         raise HTTPException(404, "Schedule not found")
-    return obj
+    return row_response(obj, names, response) if names else obj
 
 
 @router.post("", response_model=DoctorScheduleOut, status_code=201)
-def create_schedule(payload: DoctorScheduleCreate, db: Session = Depends(get_session)):
+async def create_schedule(payload: DoctorScheduleCreate, db: AsyncSession = Depends(get_session)):
     try:
         payload = DoctorSchedule.model_validate(payload)
         db.add(payload)
-        db.commit()
-        db.refresh(payload)
+        await db.commit()
+        invalidate_count(DoctorSchedule)
+        bump(DoctorSchedule)
+        await db.refresh(payload)
         return payload
     except IntegrityError as e:
         raise HTTPException(status_code=400, detail=f"{e.orig}")
 
 
 @router.patch("/{schedule_id}", response_model=DoctorScheduleOut)
-def update_schedule(schedule_id: int, payload: DoctorScheduleUpdate, db: Session = Depends(get_session)):
-    obj = db.get(DoctorSchedule, schedule_id)
+async def update_schedule(schedule_id: int, payload: DoctorScheduleUpdate, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(DoctorSchedule, schedule_id)
     if not obj:
         raise HTTPException(404, "Schedule not found")
     for k, v in payload.dict(exclude_unset=True).items():
         setattr(obj, k, v)
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    bump(DoctorSchedule)
+    await db.refresh(obj)
     return obj
 
 
 @router.delete("/{schedule_id}", status_code=204)
-def delete_schedule(schedule_id: int, db: Session = Depends(get_session)):
-    obj = db.get(DoctorSchedule, schedule_id)
+async def delete_schedule(schedule_id: int, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(DoctorSchedule, schedule_id)
     if not obj:
         raise HTTPException(404, "Schedule not found")
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
+    invalidate_count(DoctorSchedule)
+    bump(DoctorSchedule)
@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.api.conditional import conditional_get
+from app.api.counts import invalidate_count
+from app.api.fields import FIELDS_QUERY, parse_fields, project, rows_response, row_response, get_projected
+from app.api.pagination import paginate
+from app.api.serialization import serialize
 from app.db.session import get_session
+from app.db.table_versions import bump
 from app.models.branch import Section
 from app.schema.branch import SectionOut, SectionCreate, SectionUpdate
 from sqlalchemy.exc import IntegrityError
@@ -10,54 +17,76 @@ from sqlalchemy.exc import IntegrityError
 router = APIRouter(prefix="/sections", tags=["sections"])
 
 
-@router.get("", response_model=List[SectionOut])
-def list_sections(db: Session = Depends(get_session),
-                  branch_id: int | None = None,
-                  limit: int = Query(100, ge=1, le=500),
-                  offset: int = Query(0, ge=0)):
+def list_query(branch_id: int | None = None):
     q = select(Section)
     if branch_id is not None:
         q = q.where(Section.branch_id == branch_id)
-    return db.exec(q.offset(offset).limit(limit)).all()
+    return q
 
 
-@router.get("/{section_id}", response_model=SectionOut)
-def get_section(section_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Section, section_id)
+@router.get("", response_model=List[SectionOut], dependencies=[conditional_get(Section)])
+async def list_sections(response: Response,
+                        db: AsyncSession = Depends(get_session),
+                        branch_id: int | None = None,
+                        limit: int = Query(100, ge=1, le=500),
+                        cursor: str | None = None,
+                        with_total: bool = False,
+                        fields: str | None = FIELDS_QUERY,
+                        offset: int | None = Query(None, ge=0, deprecated=True)):
+    names = parse_fields(fields, SectionOut)
+    keys = [Section.id]
+    q = list_query(branch_id)
+    if names:
+        q = project(q, Section, names, keys)
+    rows = await paginate(db, q, keys, response, limit=limit, cursor=cursor, offset=offset,
+                          with_total=with_total)
+    return rows_response(rows, names, response) if names else serialize(rows, SectionOut, response)
+
+
+@router.get("/{section_id}", response_model=SectionOut, dependencies=[conditional_get(Section)])
+async def get_section(response: Response, section_id: int, fields: str | None = FIELDS_QUERY,
+                      db: AsyncSession = Depends(get_session)):
+    names = parse_fields(fields, SectionOut)
+    obj = await get_projected(db, Section, section_id, names) if names else await db.get(Section, section_id)
     if not obj:
         raise HTTPException(404, "Section not found")
-    return obj
+    return row_response(obj, names, response) if names else obj
 
 
 @router.post("", response_model=SectionOut, status_code=201)
-def create_section(payload: SectionCreate, db: Session = Depends(get_session)):
+async def create_section(payload: SectionCreate, db: AsyncSession = Depends(get_session)):
     try:
         payload = Section.model_validate(payload)
         db.add(payload)
-        db.commit()
-        db.refresh(payload)
+        await db.commit()
+        invalidate_count(Section)
+        bump(Section)
+        await db.refresh(payload)
         return payload
     except IntegrityError as e:
         raise HTTPException(status_code=400, detail=f"{e.orig}")
 
 
 @router.patch("/{section_id}", response_model=SectionOut)
-def update_section(section_id: int, payload: SectionUpdate, db: Session = Depends(get_session)):
-    obj = db.get(Section, section_id)
+async def update_section(section_id: int, payload: SectionUpdate, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(Section, section_id)
     if not obj:
         raise HTTPException(404, "Section not found")
     for k, v in payload.dict(exclude_unset=True).items():
         setattr(obj, k, v)
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    bump(Section)
+    await db.refresh(obj)
     return obj
 
 
 @router.delete("/{section_id}", status_code=204)
-def delete_section(section_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Section, section_id)
+async def delete_section(section_id: int, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(Section, section_id)
     if not obj:
         raise HTTPException(404, "Section not found")
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
+    invalidate_count(Section)
+    bump(Section)
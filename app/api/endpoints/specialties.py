@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
+from app.api.conditional import conditional_get
+from app.api.counts import invalidate_count
+from app.api.fields import FIELDS_QUERY, parse_fields, project, rows_response, row_response, get_projected
+from app.api.pagination import paginate
+from app.api.serialization import serialize
 from app.db.session import get_session
+from app.db.table_versions import bump
 from app.models import User
 from app.models.specialty import Specialty
 from app.schema.specialty import SpecialtyOut, SpecialtyCreate, SpecialtyUpdate
@@ -11,55 +18,76 @@ from app.schema.specialty import SpecialtyOut, SpecialtyCreate, SpecialtyUpdate
 router = APIRouter(prefix="/specialties", tags=["specialties"])
 
 
-@router.get("", response_model=List[SpecialtyOut])
-def list_specialties(sp: Optional[str] = Query(None),
-                     db: Session = Depends(get_session),
-                     limit: int = Query(100, ge=1, le=500),
-                     offset: int = Query(0, ge=0)):
+def list_query(sp: str | None = None):
     q = select(Specialty)
     if sp:
         q = q.where(Specialty.name.like(f"{sp}%"))
-    q = q.offset(offset).limit(limit)
-    return db.exec(q).all()
+    return q
 
 
-@router.get("/{specialty_id}", response_model=SpecialtyOut)
-def get_specialty(specialty_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Specialty, specialty_id)
+@router.get("", response_model=List[SpecialtyOut], dependencies=[conditional_get(Specialty)])
+async def list_specialties(response: Response,
+                           sp: Optional[str] = Query(None),
+                           db: AsyncSession = Depends(get_session),
+                           limit: int = Query(100, ge=1, le=500),
+                           cursor: str | None = None,
+                           with_total: bool = False,
+                           fields: str | None = FIELDS_QUERY,
+                           offset: int | None = Query(None, ge=0, deprecated=True)):
+    names = parse_fields(fields, SpecialtyOut)
+    keys = [Specialty.id]
+    q = list_query(sp)
+    if names:
+        q = project(q, Specialty, names, keys)
+    rows = await paginate(db, q, keys, response, limit=limit, cursor=cursor, offset=offset,
+                          with_total=with_total)
+    return rows_response(rows, names, response) if names else serialize(rows, SpecialtyOut, response)
+
+
+@router.get("/{specialty_id}", response_model=SpecialtyOut, dependencies=[conditional_get(Specialty)])
+async def get_specialty(response: Response, specialty_id: int, fields: str | None = FIELDS_QUERY,
+                        db: AsyncSession = Depends(get_session)):
+    names = parse_fields(fields, SpecialtyOut)
+    obj = await get_projected(db, Specialty, specialty_id, names) if names else await db.get(Specialty, specialty_id)
     if not obj:
         raise HTTPException(404, "Specialty not found")
-    return obj
+    return row_response(obj, names, response) if names else obj
 
 
 @router.post("", response_model=SpecialtyOut, status_code=201)
-def create_specialty(payload: SpecialtyCreate, db: Session = Depends(get_session)):
+async def create_specialty(payload: SpecialtyCreate, db: AsyncSession = Depends(get_session)):
     try:
         paylod = Specialty.model_validate(payload)
         db.add(paylod)
-        db.commit()
-        db.refresh(paylod)
+        await db.commit()
+        invalidate_count(Specialty)
+        bump(Specialty)
+        await db.refresh(paylod)
         return paylod
     except IntegrityError as e:
         raise HTTPException(status_code=400, detail="UNIQUE constraint failed: specialty.name")
 
 
 @router.patch("/{specialty_id}", response_model=SpecialtyOut)
-def update_specialty(specialty_id: int, payload: SpecialtyUpdate, db: Session = Depends(get_session)):
-    obj = db.get(Specialty, specialty_id)
+async def update_specialty(specialty_id: int, payload: SpecialtyUpdate, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(Specialty, specialty_id)
     if not obj:
         raise HTTPException(404, "Specialty not found")
     for k, v in payload.dict(exclude_unset=True).items():
         setattr(obj, k, v)
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    bump(Specialty)
+    await db.refresh(obj)
     return obj
 
 
 @router.delete("/{specialty_id}", status_code=204)
-def delete_specialty(specialty_id: int, db: Session = Depends(get_session)):
-    obj = db.get(Specialty, specialty_id)
+async def delete_specialty(specialty_id: int, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(Specialty, specialty_id)
     if not obj:
         raise HTTPException(404, "Specialty not found")
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
+    invalidate_count(Specialty)
+    bump(Specialty)
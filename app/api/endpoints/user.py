@@ -1,11 +1,17 @@
 from typing import List, Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Query, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Query, Response, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.api.counts import invalidate_count
+from app.api.fields import FIELDS_QUERY, parse_fields, project, rows_response, row_response, get_projected
+from app.api.pagination import paginate
+from app.api.serialization import serialize
 from app.api.security_utils.auth_state import auth_required
 from app.api.security_utils.password import get_current_user
-from app.db.session import get_session
+from app.api.security_utils.principal_cache import invalidate_principal
+from app.db.session import get_session, get_read_session
 from app.models import User, Role
 
 from app.schema.user import UserOut, UserUpdate
@@ -14,19 +20,34 @@ from app.schema.user import UserOut, UserUpdate
 user_route = APIRouter()
 
 
-@user_route.get('/', response_model=List[UserOut])
-async def list_users(role: Optional[Role] = Query(None),
-                     search_full_name: Optional[str] = Query(None),
-                     limit: int = Query(50, ge=1, le=200),
-                     offset: int = Query(0, ge=0),
-                     db: Session = Depends(get_session)):
+def list_query(role: Role | None = None, search_full_name: str | None = None):
     q = select(User)
     if role:
         q = q.where(User.role == role)
 
     if search_full_name:
         q = q.where(User.full_name.like(f"{search_full_name}%"))
-    return db.exec(q.offset(offset).limit(limit)).all()
+    return q
+
+
+@user_route.get('/', response_model=List[UserOut])
+async def list_users(response: Response,
+                     role: Optional[Role] = Query(None),
+                     search_full_name: Optional[str] = Query(None),
+                     limit: int = Query(50, ge=1, le=200),
+                     cursor: str | None = None,
+                     with_total: bool = False,
+                     fields: str | None = FIELDS_QUERY,
+                     offset: int | None = Query(None, ge=0, deprecated=True),
+                     db: AsyncSession = Depends(get_read_session)):
+    names = parse_fields(fields, UserOut)
+    keys = [User.id]
+    q = list_query(role, search_full_name)
+    if names:
+        q = project(q, User, names, keys)
+    rows = await paginate(db, q, keys, response, limit=limit, cursor=cursor, offset=offset,
+                          with_total=with_total)
+    return rows_response(rows, names, response) if names else serialize(rows, UserOut, response)
 
 
 @user_route.get('/me', response_model=UserOut)
@@ -35,31 +56,36 @@ async def get_me(request: Request):
 
 
 @user_route.get("/{user_id}", response_model=UserOut)
-def get_user(user_id: int, db: Session = Depends(get_session)):
-    obj = db.get(User, user_id)
+async def get_user(user_id: int, fields: str | None = FIELDS_QUERY,
+                   db: AsyncSession = Depends(get_read_session)):
+    names = parse_fields(fields, UserOut)
+    obj = await get_projected(db, User, user_id, names) if names else await db.get(User, user_id)
     if not obj:
         raise HTTPException(404, "User not found")
-    return obj
+    return row_response(obj, names) if names else obj
 
 
 @user_route.patch("/{user_id}", response_model=UserOut)
-def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_session)):
-    obj = db.get(User, user_id)
+async def update_user(user_id: int, payload: UserUpdate, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(User, user_id)
     if not obj:
         raise HTTPException(404, "User not found")
     update_data = payload.dict(exclude_unset=True)
     for k, v in update_data.items():
         setattr(obj, k, v)
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    await db.refresh(obj)
+    invalidate_principal(user_id)
     return obj
 
 
 @user_route.delete("/{user_id}", status_code=204)
-def delete_user(user_id: int, db: Session = Depends(get_session)):
-    obj = db.get(User, user_id)
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_session)):
+    obj = await db.get(User, user_id)
     if not obj:
         raise HTTPException(404, "User not found")
-    db.delete(obj)
-    db.commit()
+    await db.delete(obj)
+    await db.commit()
+    invalidate_principal(user_id)
+    invalidate_count(User)
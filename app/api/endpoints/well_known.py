@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from app.api.security_utils.keys import key_ring
+from app.core.config import get_settings
+
+settings = get_settings()
+
+router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+
+@router.get("/jwks.json")
+async def jwks(response: Response):
+    # Boshqa servislar tokenlarni shu public kalitlar bilan lokal tekshiradi
+    response.headers['Cache-Control'] = f"public, max-age={settings.JWKS_MAX_AGE}"
+    return key_ring.jwks()
@@ -31,4 +31,23 @@ class InvalidToken(BaseAuthExpn):
 
 class UserNotFound(BaseAuthExpn):
     def __init__(self, detail: str = "User not Found."):
-        super().__init__(detail=detail)
\ No newline at end of file
+        super().__init__(detail=detail)
+
+
+class ServiceBusy(HTTPException):
+    def __init__(self, detail: str = "Server band, birozdan so'ng qayta urinib ko'ring.", retry_after: int = 1):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                         detail=detail,
+                         headers={"Retry-After": str(retry_after)})
+
+
+class TooManyRequests(HTTPException):
+    def __init__(self, detail: str = "Juda ko'p urinish, birozdan so'ng qayta urinib ko'ring.", retry_after: int = 1):
+        super().__init__(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                         detail=detail,
+                         headers={"Retry-After": str(retry_after)})
+
+
+class BookingConflict(HTTPException):
+    def __init__(self, detail: str = "Bu vaqt band."):
+        super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
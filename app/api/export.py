@@ -0,0 +1,60 @@
+# Katta hisobotlar uchun oqimli eksport (NDJSON / CSV). Qatorlar server-side cursor / yield_per
+# bilan EXPORT_BATCH_SIZE tadan o'qiladi va darhol klientga yoziladi - xotira natija hajmiga bog'liq emas.
+# Ulanish generator ichida ochiladi: yield-dependency sessiyasi javob oqimi boshlanishidan oldin yopiladi.
+import csv
+import io
+from datetime import date, time
+from decimal import Decimal
+from enum import Enum
+from typing import AsyncIterator, Literal, Sequence
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+
+from app.core.config import get_settings
+from app.db.session import engine, read_engine, wants_primary
+
+settings = get_settings()
+
+ExportFormat = Literal['ndjson', 'csv']
+
+MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv; charset=utf-8'}
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return format(value, 'f')
+    return value
+
+
+async def _stream(bind, stmt, names: Sequence[str], fmt: ExportFormat) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(names)
+    async with bind.connect() as conn:
+        result = await conn.stream(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            if fmt == 'ndjson':
+                yield b''.join(to_json(dict(zip(names, row))) + b'\n' for row in rows)
+                continue
+            writer.writerows([_csv_value(v) for v in row] for row in rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if fmt == 'csv' and buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def export_response(request: Request, stmt, names: Sequence[str], fmt: ExportFormat, filename: str):
+    # Read-your-writes qoidasi oddiy GET lardagidek
+    bind = engine if wants_primary(request) else read_engine
+    headers = {'Content-Disposition': f'attachment; filename="{filename}.{fmt}"'}
+    return StreamingResponse(_stream(bind, stmt, names, fmt), media_type=MEDIA_TYPES[fmt], headers=headers)
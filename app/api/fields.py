@@ -0,0 +1,49 @@
+# Sparse fieldsets: ?fields=id,full_name - SQL da faqat so'ralgan ustunlar tanlanadi, natija ORM
+# obyektlari va response_model validatsiyasisiz to'g'ridan-to'g'ri JSON qilinadi.
+# Ruxsat etilgan nomlar - endpointning Out sxemasi maydonlari (masalan, users.password so'ralmaydi).
+from typing import Sequence
+
+from fastapi import HTTPException, Query, Response
+from pydantic_core import to_json
+from sqlalchemy import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+FIELDS_QUERY = Query(None, description="Vergul bilan ajratilgan maydonlar, masalan: id,full_name")
+
+
+def parse_fields(fields: str | None, schema) -> list[str] | None:
+    if not fields:
+        return None
+    names = list(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    unknown = [n for n in names if n not in schema.model_fields]
+    if unknown or not names:
+        raise HTTPException(400, f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(schema.model_fields)}")
+    return names
+
+
+def project(q, model, names: Sequence[str], keys: Sequence = ()):
+    # Keyset cursor uchun saralash kalitlari ham tanlanadi (javobga faqat so'ralganlari chiqadi).
+    # sqlalchemy select: sqlmodel bitta ustunli select natijasini scalar ga aylantirib yuboradi.
+    columns = [getattr(model, n) for n in names]
+    columns += [k for k in keys if k.key not in names]
+    projected = select(*columns).select_from(model)
+    return projected if q.whereclause is None else projected.where(q.whereclause)
+
+
+def json_response(body: bytes, response: Response | None = None) -> Response:
+    # Injected response dagi headerlar (cursor, X-Total-Count, ETag) qaytarilgan Response ga o'zi o'tmaydi
+    headers = dict(response.headers) if response is not None else None
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+def rows_response(rows, names: Sequence[str], response: Response) -> Response:
+    return json_response(to_json([{n: row._mapping[n] for n in names} for row in rows]), response)
+
+
+def row_response(row, names: Sequence[str], response: Response | None = None) -> Response:
+    return json_response(to_json({n: row._mapping[n] for n in names}), response)
+
+
+async def get_projected(db: AsyncSession, model, object_id: int, names: Sequence[str]):
+    q = select(*(getattr(model, n) for n in names)).where(model.id == object_id)
+    return (await db.exec(q)).first()
@@ -0,0 +1,83 @@
+# Keyset (cursor) pagination: sahifa oxirgi ko'rilgan kalitdan davom etadi (WHERE key > cursor),
+# shuning uchun chuqur sahifalar ham OFFSET kabi oldingi qatorlarni qayta o'qimaydi.
+# Cursor - saralash kalitlari qiymatlarining base64(JSON) ko'rinishi, mijoz uchun "opaque".
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.counts import set_total_count
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+PREV_CURSOR_HEADER = 'X-Prev-Cursor'
+
+
+def encode_cursor(values: Sequence[Any], direction: str = 'next') -> str:
+    raw = json.dumps({'k': [v.isoformat() if isinstance(v, (date, time)) else v for v in values], 'd': direction},
+                     separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> tuple[list[Any], str]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        values, direction = data['k'], data['d']
+        if len(values) != len(keys) or direction not in ('next', 'prev'):
+            raise ValueError
+        parsed = []
+        for key, value in zip(keys, values):
+            python_type = key.type.python_type
+            parsed.append(python_type.fromisoformat(value) if python_type in (datetime, date, time) else value)
+        return parsed, direction
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def row_key(row, keys: Sequence) -> list[Any]:
+    return [getattr(row, key.key) for key in keys]
+
+
+def keyset_query(q, keys: Sequence, values: Sequence[Any] | None = None, direction: str = 'next'):
+    # (k1, k2) > (v1, v2) - row value taqqoslash; kalitlar indeks tartibiga mos bo'lishi kerak
+    if values is not None:
+        key, value = (tuple_(*keys), tuple_(*values)) if len(keys) > 1 else (keys[0], values[0])
+        q = q.where(key > value if direction == 'next' else key < value)
+    if direction == 'next':
+        return q.order_by(*keys)
+    return q.order_by(*(k.desc() for k in keys))
+
+
+async def paginate(db: AsyncSession, q, keys: Sequence, response: Response, *, limit: int,
+                   cursor: str | None = None, offset: int | None = None, with_total: bool = False) -> list:
+    if with_total:
+        await set_total_count(db, response, q, keys[-1].class_)
+
+    if cursor is None and offset is not None:
+        # Eskirgan yo'l: OFFSET saqlangan, lekin keyingi sahifa uchun cursor ham qaytariladi
+        rows = list((await db.exec(keyset_query(q, keys).offset(offset).limit(limit))).all())
+        response.headers['Deprecation'] = 'true'
+        if len(rows) == limit:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(row_key(rows[-1], keys))
+        if offset and rows:
+            response.headers[PREV_CURSOR_HEADER] = encode_cursor(row_key(rows[0], keys), 'prev')
+        return rows
+
+    values, direction = decode_cursor(cursor, keys) if cursor else (None, 'next')
+    rows = list((await db.exec(keyset_query(q, keys, values, direction).limit(limit + 1))).all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == 'prev':
+        rows.reverse()
+
+    # Cursor bilan kelingan bo'lsa, kelingan tomonda ham qatorlar bor
+    more_after = has_more if direction == 'next' else values is not None
+    more_before = has_more if direction == 'prev' else values is not None
+    if rows and more_after:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(row_key(rows[-1], keys))
+    if rows and more_before:
+        response.headers[PREV_CURSOR_HEADER] = encode_cursor(row_key(rows[0], keys), 'prev')
+    return rows
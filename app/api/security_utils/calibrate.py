@@ -0,0 +1,53 @@
+# bcrypt work factor ni shu mashinada o'lchab tanlash:
+#   python -m app.api.security_utils.calibrate --budget-ms 250
+# Natijani .env ga BCRYPT_ROUNDS=<n> qilib yozing.
+import argparse
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+RECOMMENDED_MIN_ROUNDS = 10
+
+
+def measure_ms(rounds: int, samples: int) -> float:
+    handler = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash('calibration-password')
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(budget_ms: float, samples: int = 3) -> tuple[int, dict[int, float]]:
+    results: dict[int, float] = {}
+    chosen = MIN_ROUNDS
+    bcrypt.using(rounds=MIN_ROUNDS).hash('warm-up')  # backend yuklanishi o'lchovga tushmasin
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        results[rounds] = measure_ms(rounds, samples)
+        if results[rounds] > budget_ms:
+            break
+        chosen = rounds
+    return chosen, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="bcrypt rounds ni latency budjetiga qarab tanlash")
+    parser.add_argument('--budget-ms', type=float, default=250, help="bitta hash uchun ruxsat etilgan vaqt (ms)")
+    parser.add_argument('--samples', type=int, default=3)
+    args = parser.parse_args()
+
+    chosen, results = calibrate(args.budget_ms, args.samples)
+    for rounds, ms in results.items():
+        mark = '  <-' if rounds == chosen else ''
+        print(f"rounds={rounds:2d}  {ms:8.1f} ms{mark}")
+    if chosen < RECOMMENDED_MIN_ROUNDS:
+        print(f"Ogohlantirish: {chosen} < {RECOMMENDED_MIN_ROUNDS}, budjet juda kichik bo'lishi mumkin.")
+    print(f"BCRYPT_ROUNDS={chosen}")
+
+
+if __name__ == '__main__':
+    main()
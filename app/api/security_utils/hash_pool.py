@@ -0,0 +1,42 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.api.exceptions import ServiceBusy
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+# bcrypt kabi CPU-og'ir ishlarni event loopdan tashqarida bajaradi.
+# Navbat chegaralangan: workers + queue_size dan ortiq ish kelsa,
+# kutib turmasdan darhol ServiceBusy (503 + Retry-After) qaytadi.
+class HashPool:
+
+    def __init__(self, workers: int, queue_size: int, retry_after: int = 1):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hash-pool')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusy(retry_after=self.retry_after)
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Slot faqat ish tugaganda bo'shaydi (so'rov bekor qilinsa ham thread ishlab turgan bo'ladi)
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+hash_pool = HashPool(workers=settings.HASH_POOL_WORKERS,
+                     queue_size=settings.HASH_POOL_QUEUE_SIZE,
+                     retry_after=settings.HASH_POOL_RETRY_AFTER)
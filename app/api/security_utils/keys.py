@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from jose import jwk, jwt, JWTError
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class KeyRing:
+    # HS* algoritmlarda SECRET_KEY bilan ishlaydi (kid yo'q, JWKS bo'sh).
+    # RS*/ES* da JWT_KEYS_DIR ichidagi kalitlar ishlatiladi:
+    #   <kid>.pem      - private kalit (imzolash + tekshirish)
+    #   <kid>.pub.pem  - faqat public kalit (rotatsiyadan keyin eski tokenlarni tekshirish uchun)
+
+    def __init__(self, algorithm: str, secret: str, keys_dir: str | None = None, active_kid: str | None = None):
+        self.algorithm = algorithm
+        self.secret = secret
+        self.private_keys: dict[str, str] = {}
+        self.public_keys: dict[str, str] = {}
+        self.active_kid: str | None = None
+
+        if self.symmetric:
+            return
+        if not keys_dir:
+            raise RuntimeError(f"{algorithm} uchun JWT_KEYS_DIR sozlanishi kerak")
+
+        for path in sorted(Path(keys_dir).glob('*.pem')):
+            pem = path.read_text()
+            if path.name.endswith('.pub.pem'):
+                self.public_keys[path.name[:-len('.pub.pem')]] = pem
+            else:
+                kid = path.stem
+                self.private_keys[kid] = pem
+                self.public_keys[kid] = jwk.construct(pem, algorithm).public_key().to_pem().decode()
+
+        if not self.private_keys:
+            raise RuntimeError(f"{keys_dir} da imzolash uchun private kalit topilmadi")
+        self.active_kid = active_kid or sorted(self.private_keys)[-1]
+        if self.active_kid not in self.private_keys:
+            raise RuntimeError(f"JWT_ACTIVE_KID={self.active_kid} uchun private kalit topilmadi")
+
+    @property
+    def symmetric(self) -> bool:
+        return self.algorithm.startswith('HS')
+
+    def encode(self, claims: dict) -> str:
+        if self.symmetric:
+            return jwt.encode(claims, self.secret, algorithm=self.algorithm)
+        return jwt.encode(claims, self.private_keys[self.active_kid], algorithm=self.algorithm,
+                          headers={'kid': self.active_kid})
+
+    def decode(self, token: str) -> dict:
+        # ExpiredSignatureError / JWTError ni chaqiruvchi o'zi HTTP xatoga aylantiradi
+        if self.symmetric:
+            return jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        kid = jwt.get_unverified_header(token).get('kid')
+        key = self.public_keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown kid: {kid}")
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+    def jwks(self) -> dict:
+        keys = []
+        for kid, pem in self.public_keys.items():
+            data = jwk.construct(pem, self.algorithm).to_dict()
+            keys.append({**data, 'kid': kid, 'use': 'sig', 'alg': self.algorithm})
+        return {'keys': keys}
+
+
+key_ring = KeyRing(algorithm=settings.ALGORITHM,
+                   secret=settings.SECRET_KEY,
+                   keys_dir=settings.JWT_KEYS_DIR,
+                   active_kid=settings.JWT_ACTIVE_KID)
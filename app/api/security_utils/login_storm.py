@@ -0,0 +1,118 @@
+# Login "bo'roni" paytida o'tkazuvchanlik va boshqa endpoint latency si (vaqtinchalik SQLite baza):
+#   python -m app.api.security_utils.login_storm --logins 200 --concurrency 50
+# Bir vaqtda --concurrency ta /auth/login yuboriladi, shu bilan birga /.well-known/jwks.json (DB va
+# bcrypt siz endpoint) har --probe-interval ms da so'raladi. "inline" - bcrypt event loop ichida
+# (hash_pool gacha bo'lgan holat), "pool" - hash_pool orqali. Rate limit o'chiriladi.
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+PASSWORD = 'storm-password'
+
+
+def _p99(timings: list[float]) -> float:
+    return statistics.quantiles(timings, n=100)[98] if len(timings) > 1 else timings[0]
+
+
+async def _storm(client, logins: int, concurrency: int, probe_interval: float) -> dict:
+    gate = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+    statuses: dict[int, int] = {}
+    probes: list[float] = []
+
+    async def login():
+        async with gate:
+            response = await client.post('/api/v1/auth/login', json={'email': 'storm@example.com',
+                                                                      'password': PASSWORD})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def probe():
+        # Latency rejalashtirilgan vaqtdan hisoblanadi: loop bloklangan paytda yuborilmay qolgan
+        # so'rovlarning kutishi ham o'lchovga tushadi (aks holda inline rejim yaxshi ko'rinib qoladi)
+        scheduled = time.perf_counter()
+        while not done.is_set():
+            await client.get('/.well-known/jwks.json')
+            now = time.perf_counter()
+            while scheduled <= now:
+                probes.append((now - scheduled) * 1000)
+                scheduled += probe_interval / 1000
+            await asyncio.sleep(scheduled - now)
+
+    prober = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+    return {'elapsed': elapsed, 'statuses': statuses, 'probes': probes}
+
+
+async def _run(modes: list[str], logins: int, concurrency: int, probe_interval: float) -> None:
+    import httpx
+
+    from app.api.endpoints import auth
+    from app.api.security_utils.password import password_hash, verify_password
+    from app.api.security_utils.rate_limit import login_rate_limit
+    from app.db.session import build_engine, get_session
+    from app.main import app
+    from app.models import User
+
+    engine = build_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'storm.db')}")
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with factory() as db:
+        db.add(User(email='storm@example.com', password=password_hash(PASSWORD), full_name='S', phone='0'))
+        await db.commit()
+
+    async def session_override():
+        async with factory() as session:
+            yield session
+
+    async def no_rate_limit():
+        return None
+
+    async def inline_verify(plain_pwd: str, hashed_pwd: str) -> bool:
+        return verify_password(plain_pwd, hashed_pwd)
+
+    pooled_verify = auth.async_verify_password
+    app.dependency_overrides[get_session] = session_override
+    app.dependency_overrides[login_rate_limit] = no_rate_limit
+    print(f"{logins} login, bir vaqtda {concurrency}; probe: GET /.well-known/jwks.json")
+    print(f"{'rejim':<8}{'login/s':>10}{'probe p50':>12}{'probe p99':>12}{'probe max':>12}   statuslar")
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            for mode in modes:
+                auth.async_verify_password = inline_verify if mode == 'inline' else pooled_verify
+                result = await _storm(client, logins, concurrency, probe_interval)
+                probes = result['probes']
+                print(f"{mode:<8}{logins / result['elapsed']:>10.1f}{statistics.median(probes):>12.2f}"
+                      f"{_p99(probes):>12.2f}{max(probes):>12.2f}   {result['statuses']}")
+    finally:
+        auth.async_verify_password = pooled_verify
+        app.dependency_overrides.pop(get_session, None)
+        app.dependency_overrides.pop(login_rate_limit, None)
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Login bo'roni: bcrypt inline va hash_pool orqali (ms)")
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--probe-interval', type=float, default=5, help="probe so'rovlari rejasi oralig'i (ms)")
+    parser.add_argument('--mode', choices=['inline', 'pool', 'both'], default='both')
+    args = parser.parse_args()
+    modes = ['inline', 'pool'] if args.mode == 'both' else [args.mode]
+    asyncio.run(_run(modes, args.logins, args.concurrency, args.probe_interval))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,39 @@
+# Parol hashlash, JWT va get_current_user.
+#   python -m app.api.security_utils.password --bench   # get_current_user: keshsiz (oldin) va keshli (keyin)
+import argparse
+import asyncio
+import hashlib
+import os
+import statistics
+import tempfile
+import time
 from typing import Annotated, Type
 from uuid import uuid4
 
 from passlib.context import CryptContext
 from datetime import datetime, timezone, timedelta
 from jose import jwt, ExpiredSignatureError, JWTError
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.exceptions import ExpiredToken, InvalidToken, UserNotFound
+from app.api.security_utils.hash_pool import hash_pool
+from app.api.security_utils.keys import key_ring
+from app.api.security_utils.principal_cache import get_cached_principal, cache_principal
+from app.api.security_utils.revocation import revocation_store
+from app.core.cache import TTLCache
 from app.db.session import settings, get_session
 from app.models import User
 from app.schema.auth import Token
 from fastapi import Depends, HTTPException, status, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-myctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# BCRYPT_ROUNDS berilsa, boshqa cost dagi hashlar needs_update=True bo'ladi va login paytida qayta hashlanadi
+_bcrypt_rounds = {f"bcrypt__{k}": settings.BCRYPT_ROUNDS
+                  for k in ('default_rounds', 'min_rounds', 'max_rounds')} if settings.BCRYPT_ROUNDS else {}
+myctx = CryptContext(schemes=["bcrypt"], deprecated="auto", **_bcrypt_rounds)
 bearer_schema = HTTPBearer(auto_error=False)
 
-_BLOCKED_JTIS: dict[str, int] = {}  # jti -> exp_ts
+verified_token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 
 def _now_utc():
@@ -29,25 +46,13 @@ def _now_ts() -> int:
 
 def block_jti(jti: str, exp_ts: int) -> None:
     if jti and exp_ts:
-        _BLOCKED_JTIS[jti] = exp_ts
-
-
-def _gc_blocked() -> None:
-    now = _now_ts()
-    for jti, exp in list(_BLOCKED_JTIS.items()):
-        print(f"exp: {exp}, now: {now}", end=">>>")
-        if exp <= now:
-            print(f" done")
-            _BLOCKED_JTIS.pop(jti, None)
-        else:
-            print(f" not done")
+        revocation_store.add(jti, int(exp_ts))
 
 
 def is_jti_blocked(jti: str) -> bool:
     if not jti:
         return False
-    _gc_blocked()
-    return jti in _BLOCKED_JTIS
+    return revocation_store.contains(jti)
 
 
 def peek_jti_and_exp(token: str) -> tuple[str | None, int]:
@@ -66,6 +71,37 @@ def verify_password(plain_pwd: str, hashed_pwd: str) -> bool:
     return myctx.verify(plain_pwd, hashed_pwd)
 
 
+def password_needs_update(hashed_pwd: str) -> bool:
+    return myctx.needs_update(hashed_pwd)
+
+
+async def async_password_hash(password: str) -> str:
+    return await hash_pool.run(password_hash, password)
+
+
+async def async_verify_password(plain_pwd: str, hashed_pwd: str) -> bool:
+    return await hash_pool.run(verify_password, plain_pwd, hashed_pwd)
+
+
+_DUMMY_HASH: str | None = None
+
+
+def _verify_dummy_password(plain_pwd: str) -> bool:
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = password_hash('dummy-password')
+    return verify_password(plain_pwd, _DUMMY_HASH)
+
+
+async def async_verify_dummy_password(plain_pwd: str) -> bool:
+    # Mavjud bo'lmagan email uchun ham bcrypt ishlasin (javob vaqti orqali email oshkor bo'lmasin)
+    return await hash_pool.run(_verify_dummy_password, plain_pwd)
+
+
+def token_claims(user: User) -> dict:
+    return {"sub": str(user.id), "ver": user.token_version}
+
+
 def create_access_token(data: dict, expire_minutes: int | None = None) -> str:
     now = _now_utc()
     exp_dt = now + timedelta(minutes=expire_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -76,7 +112,7 @@ def create_access_token(data: dict, expire_minutes: int | None = None) -> str:
         'iat': int(now.timestamp()),
         "exp": int(exp_dt.timestamp()),
     }
-    access_token = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    access_token = key_ring.encode(to_encode)
     return access_token
 
 
@@ -90,7 +126,7 @@ def create_refresh_token(data: dict, expire_days: int | None = None) -> str:
         "iat": int(now.timestamp()),
         'exp': int(exp_dt.timestamp()),
     }
-    ref_token = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    ref_token = key_ring.encode(to_encode)
     return ref_token
 
 
@@ -98,13 +134,25 @@ def create_token_pair(data: dict) -> tuple[str, str]:
     return create_access_token(data), create_refresh_token(data)
 
 
+def _verify_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = verified_token_cache.get(key)
+    if payload is None:
+        try:
+            payload = key_ring.decode(token)
+        except ExpiredSignatureError:
+            raise ExpiredToken()
+        except JWTError:
+            raise InvalidToken()
+        # Yozuv token exp bo'lganda o'chadi, shundan keyin decode ExpiredSignatureError beradi
+        ttl = int(payload.get('exp', 0)) - _now_ts()
+        if ttl > 0:
+            verified_token_cache.set(key, payload, ttl=ttl)
+    return dict(payload)
+
+
 def decode_token(token: str, expected_type: str) -> dict:
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-    except ExpiredSignatureError:
-        raise ExpiredToken()
-    except JWTError:
-        raise InvalidToken()
+    payload = _verify_token(token)
 
     token_type = payload.get('type')
 
@@ -114,9 +162,9 @@ def decode_token(token: str, expected_type: str) -> dict:
     return payload
 
 
-def get_current_user(
+async def get_current_user(
         creds: Annotated[HTTPAuthorizationCredentials, Depends(bearer_schema)],
-        session: Annotated[Session, Depends(get_session)]) -> Type[User]:
+        session: Annotated[AsyncSession, Depends(get_session)]) -> Type[User]:
     if not creds or creds.scheme.lower() != 'bearer':
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Cridentials were not provided!")
@@ -127,17 +175,21 @@ def get_current_user(
 
     jti = payload.get('jti')
     if is_jti_blocked(jti):
-        print(f"119: {_BLOCKED_JTIS}")
         raise InvalidToken('Token blocked.')
-    print(f"124: {_BLOCKED_JTIS}")
     try:
         user_id = int(sub)
     except (TypeError, ValueError):
         raise InvalidToken('Bad subject')
 
-    user = session.get(User, user_id)
-    if not user:
-        raise UserNotFound()
+    user = get_cached_principal(user_id)
+    if user is None:
+        user = await session.get(User, user_id)
+        if not user:
+            raise UserNotFound()
+        user = cache_principal(user)
+
+    if payload.get('ver', 0) != user.token_version:
+        raise InvalidToken('Token revoked.')
     return user
 
 
@@ -155,3 +207,61 @@ def set_refresh_cookie(response: Response, refresh_token, max_ages: int | None =
 
 def clear_refresh_cookie(response: Response) -> None:
     response.delete_cookie(settings.REFRESH_COOKIE_NAME)
+
+
+async def _bench(users: int, requests: int) -> None:
+    # Vaqtinchalik SQLite baza; "oldin" - har so'rovda HMAC tekshiruvi va users dan SELECT (keshlar
+    # tozalanadi), "keyin" - verified_token_cache va principal_cache dan
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from sqlmodel import SQLModel
+
+    from app.api.security_utils.principal_cache import invalidate_principal
+    from app.db.session import build_engine
+
+    engine = build_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'auth.db')}")
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with factory() as db:
+        for i in range(users):
+            db.add(User(id=i + 1, email=f'u{i}@example.com', password='-', full_name='U', phone=str(i)))
+        await db.commit()
+        tokens = [create_access_token(token_claims(await db.get(User, i + 1))) for i in range(users)]
+
+    async def run(cold: bool) -> list[float]:
+        timings = []
+        for i in range(requests):
+            token = tokens[i % users]
+            if cold:
+                verified_token_cache.invalidate(hashlib.sha256(token.encode()).digest())
+                invalidate_principal(i % users + 1)
+            creds = HTTPAuthorizationCredentials(scheme='Bearer', credentials=token)
+            started = time.perf_counter()
+            async with factory() as db:
+                await get_current_user(creds, db)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    await run(cold=False)  # ulanishlar va keshlar isib olsin
+    print(f"get_current_user, {users} foydalanuvchi, {requests} so'rov (ms)")
+    print(f"{'':<8}{'p50':>10}{'p99':>10}{'rps':>12}")
+    for name, cold in (('oldin', True), ('keyin', False)):
+        timings = await run(cold)
+        p99 = statistics.quantiles(timings, n=100)[98]
+        print(f"{name:<8}{statistics.median(timings):>10.3f}{p99:>10.3f}{len(timings) / sum(timings) * 1000:>12.0f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="get_current_user narxi: token/principal keshlarisiz va keshlar bilan")
+    parser.add_argument('--bench', action='store_true')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    if not args.bench:
+        parser.error("--bench berilmagan")
+    asyncio.run(_bench(args.users, args.requests))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.models import User
+
+settings = get_settings()
+
+# get_current_user har so'rovda DB ga bormasligi uchun: user_id -> User (sessiyadan ajratilgan nusxa)
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+
+
+def get_cached_principal(user_id: int) -> User | None:
+    return principal_cache.get(user_id)
+
+
+def cache_principal(user: User) -> User:
+    # Sessiyaga bog'lanmagan nusxa: keyingi commit/expire keshdagi obyektga ta'sir qilmaydi
+    snapshot = User(**user.model_dump())
+    principal_cache.set(user.id, snapshot)
+    return snapshot
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate(user_id)
@@ -0,0 +1,117 @@
+import threading
+import time
+
+from fastapi import HTTPException, Request
+
+from app.api.exceptions import TooManyRequests
+from app.api.security_utils.password import decode_token
+from app.core.config import get_settings
+from app.db.shared_state import get_state_connection
+from app.schema.auth import LoginIn
+
+settings = get_settings()
+
+# Shuncha vaqt ishlatilmagan bucket allaqachon to'lgan bo'ladi - o'chirib yuborish xavfsiz
+_IDLE_TTL = 3600
+_PURGE_INTERVAL = 60
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    # "20/60" -> sig'im 20 token, 60 sekundda to'liq to'ladi
+    capacity, period = rate.split('/')
+    return int(capacity), int(capacity) / float(period)
+
+
+def _take(tokens: float, updated_at: float, capacity: int, refill: float, now: float) -> tuple[float, float]:
+    tokens = min(capacity, tokens + (now - updated_at) * refill)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / refill
+
+
+class MemoryRateLimiter:
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    def consume(self, key: str, capacity: int, refill: float) -> float:
+        now = time.time()
+        with self._lock:
+            if now >= self._next_purge:
+                self._next_purge = now + _PURGE_INTERVAL
+                for k, (_, updated_at) in list(self._buckets.items()):
+                    if updated_at < now - _IDLE_TTL:
+                        del self._buckets[k]
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens, retry_after = _take(tokens, updated_at, capacity, refill, now)
+            self._buckets[key] = (tokens, now)
+        return retry_after
+
+
+class SqliteRateLimiter:
+    # Bucketlar SHARED_STATE_PATH dagi jadvalda - barcha uvicorn workerlar uchun umumiy
+
+    def __init__(self):
+        self._next_purge = 0.0
+        get_state_connection().execute("CREATE TABLE IF NOT EXISTS rate_bucket ("
+                                       "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL"
+                                       ") WITHOUT ROWID")
+
+    def consume(self, key: str, capacity: int, refill: float) -> float:
+        now = time.time()
+        conn = get_state_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM rate_bucket WHERE key = ?", (key,)).fetchone()
+            tokens, updated_at = row if row else (capacity, now)
+            tokens, retry_after = _take(tokens, updated_at, capacity, refill, now)
+            conn.execute("INSERT INTO rate_bucket (key, tokens, updated_at) VALUES (?, ?, ?) "
+                         "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                         (key, tokens, now))
+            if now >= self._next_purge:
+                self._next_purge = now + _PURGE_INTERVAL
+                conn.execute("DELETE FROM rate_bucket WHERE updated_at < ?", (now - _IDLE_TTL,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+
+rate_limiter = MemoryRateLimiter() if settings.RATE_LIMIT_BACKEND == 'memory' else SqliteRateLimiter()
+
+
+def check_rate(key: str, rate: str) -> None:
+    capacity, refill = parse_rate(rate)
+    retry_after = rate_limiter.consume(key, capacity, refill)
+    if retry_after > 0:
+        raise TooManyRequests(retry_after=int(retry_after) + 1)
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else 'unknown'
+
+
+# Dependencylar oddiy def: FastAPI ularni threadpool da ishlatadi, SqliteRateLimiter ning bloklovchi
+# BEGIN IMMEDIATE ... COMMIT (busy_timeout gacha kutishi) event loopni to'xtatmaydi. Ulanish thread-local.
+def login_rate_limit(request: Request, body: LoginIn) -> None:
+    check_rate(f"login:ip:{_client_ip(request)}", settings.LOGIN_RATE_PER_IP)
+    check_rate(f"login:account:{body.email.lower()}", settings.LOGIN_RATE_PER_ACCOUNT)
+
+
+def refresh_rate_limit(request: Request) -> None:
+    check_rate(f"refresh:ip:{_client_ip(request)}", settings.REFRESH_RATE_PER_IP)
+
+    rt = request.cookies.get(settings.REFRESH_COOKIE_NAME)
+    if rt:
+        # Account bucket faqat imzosi tekshirilgan token sub i bo'yicha: aks holda soxta sub bilan
+        # boshqa foydalanuvchining bucketini to'ldirib qo'yish mumkin. decode natijasi keshlanadi
+        # (verified_token_cache), shuning uchun endpoint dagi decode qayta HMAC qilmaydi.
+        try:
+            sub = decode_token(rt, expected_type='refresh').get('sub')
+        except HTTPException:
+            # Yaroqsiz token - faqat IP bucket; endpoint o'zi 401 qaytaradi
+            return
+        if sub:
+            check_rate(f"refresh:account:{sub}", settings.REFRESH_RATE_PER_ACCOUNT)
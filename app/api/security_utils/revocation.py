@@ -0,0 +1,83 @@
+import heapq
+import threading
+import time
+
+from app.core.config import get_settings
+from app.db.shared_state import get_state_connection
+
+settings = get_settings()
+
+
+class MemoryRevocationStore:
+    # Faqat bitta process uchun: dict (O(1) lookup) + exp bo'yicha min-heap (amortized tozalash).
+    # Xotira faqat hali amal qilayotgan tokenlar soniga bog'liq.
+
+    def __init__(self):
+        self._exp: dict[str, int] = {}
+        self._heap: list[tuple[int, str]] = []
+        self._lock = threading.Lock()
+
+    def _purge(self, now: int) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            exp, jti = heapq.heappop(self._heap)
+            if self._exp.get(jti) == exp:
+                del self._exp[jti]
+
+    def add(self, jti: str, exp_ts: int) -> None:
+        now = int(time.time())
+        if exp_ts <= now:
+            return
+        with self._lock:
+            self._purge(now)
+            if jti not in self._exp:
+                self._exp[jti] = exp_ts
+                heapq.heappush(self._heap, (exp_ts, jti))
+
+    def contains(self, jti: str) -> bool:
+        now = int(time.time())
+        with self._lock:
+            self._purge(now)
+            exp = self._exp.get(jti)
+        return exp is not None and exp > now
+
+
+class SqliteRevocationStore:
+    # Barcha workerlar uchun umumiy: jti PRIMARY KEY bo'yicha lookup, exp indeksi bo'yicha
+    # muddati o'tganlar har purge_interval sekundda bir marta o'chiriladi.
+
+    def __init__(self, purge_interval: int = 60):
+        self.purge_interval = purge_interval
+        self._next_purge = 0
+        conn = get_state_connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS revoked_jti ("
+                     "jti TEXT PRIMARY KEY, exp INTEGER NOT NULL) WITHOUT ROWID")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_revoked_jti_exp ON revoked_jti (exp)")
+
+    def _maybe_purge(self, now: int) -> None:
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.purge_interval
+        get_state_connection().execute("DELETE FROM revoked_jti WHERE exp <= ?", (now,))
+
+    def add(self, jti: str, exp_ts: int) -> None:
+        now = int(time.time())
+        if exp_ts <= now:
+            return
+        get_state_connection().execute("INSERT OR IGNORE INTO revoked_jti (jti, exp) VALUES (?, ?)", (jti, exp_ts))
+        self._maybe_purge(now)
+
+    def contains(self, jti: str) -> bool:
+        now = int(time.time())
+        self._maybe_purge(now)
+        row = get_state_connection().execute("SELECT 1 FROM revoked_jti WHERE jti = ? AND exp > ?",
+                                             (jti, now)).fetchone()
+        return row is not None
+
+
+def _build_store():
+    if settings.REVOCATION_BACKEND == 'memory':
+        return MemoryRevocationStore()
+    return SqliteRevocationStore(purge_interval=settings.REVOCATION_PURGE_INTERVAL)
+
+
+revocation_store = _build_store()
@@ -0,0 +1,106 @@
+# Ixtiyoriy tez serializatsiya (FAST_SERIALIZATION=true). Standart yo'l: har bir ORM obyekt
+# response_model (Out sxema) ga qayta validatsiya qilinadi (UserOut da EmailStr ayniqsa qimmat) ->
+# python dict -> stdlib json.dumps. Tez yo'l: DB dan kelgan qatorlar ustun turlari bo'yicha
+# allaqachon to'g'ri, shuning uchun validatsiya qilinmaydi - jadval modelining oldindan qurilgan
+# TypeAdapter(list[Model]) serializeri (pydantic-core, Rust) faqat Out sxema maydonlarini
+# (include) to'g'ridan-to'g'ri JSON baytlarga yozadi. Out da yo'q ustunlar (users.password) chiqmaydi.
+#   python -m app.api.serialization --rows 500   # har bir qator uchun narxni solishtirish
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import List
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.api.fields import json_response
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+@lru_cache
+def list_adapter(model) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+@lru_cache
+def schema_include(schema) -> dict:
+    return {'__all__': set(schema.model_fields)}
+
+
+def dump_rows(rows: list, schema) -> bytes:
+    return list_adapter(type(rows[0])).dump_json(rows, include=schema_include(schema))
+
+
+def serialize(rows: list, schema, response: Response):
+    # O'chiq bo'lsa (yoki bo'sh ro'yxat) obyektlar o'zgarishsiz qaytadi va response_model yo'lidan o'tadi
+    if not settings.FAST_SERIALIZATION or not rows:
+        return rows
+    return json_response(dump_rows(rows, schema), response)
+
+
+def _sample_rows(n: int) -> dict:
+    from app.models import Appointment, Payment, User
+    from app.models.enums import PaymentMethod, PaymentStatus, Role
+    from app.schema.appointment import AppointmentOut
+    from app.schema.user import UserOut
+
+    start = datetime(2026, 1, 5, 9)
+    return {
+        'AppointmentOut': (AppointmentOut, [
+            Appointment(id=i, doctor_id=1, patient_id=2, room_id=3, start_at=start + timedelta(minutes=30 * i),
+                        end_at=start + timedelta(minutes=30 * i + 20), note='nazorat ko\'rigi')
+            for i in range(n)]),
+        'UserOut': (UserOut, [
+            User(id=i, email=f'user{i}@example.com', password='$2b$12$' + 'x' * 53, full_name='Alisher Karimov',
+                 phone='+998901234567', role=Role.doctor, bio='Kardiolog, 10 yillik tajriba', specialty_id=1,
+                 created_at=start)
+            for i in range(n)]),
+        'Payment': (Payment, [
+            Payment(id=i, appointment_id=i, amount=Decimal('150000.00'), currency='UZS', method=PaymentMethod.card,
+                    status=PaymentStatus.paid, paid_at=start, reference=f'TX{i:010d}')
+            for i in range(n)]),
+    }
+
+
+def _per_row_us(fn, rows: list, repeat: int) -> float:
+    fn()  # birinchi chaqiruv (adapter/schema qurilishi) o'lchovga tushmasin
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat / len(rows) * 1e6
+
+
+def main() -> None:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+
+    parser = argparse.ArgumentParser(description="response_model va tez serializatsiya yo'lini solishtirish")
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    print(f"{'schema':<16}{'response_model':>18}{'fast path':>14}{'speedup':>10}   (us/row, {args.rows} rows)")
+    for name, (schema, rows) in _sample_rows(args.rows).items():
+        field = create_model_field(name=f'Response_{name}', type_=List[schema], mode='serialization')
+
+        def default_path():
+            content = loop.run_until_complete(serialize_response(field=field, response_content=rows))
+            return JSONResponse(content).body
+
+        def fast_path():
+            return dump_rows(rows, schema)
+
+        slow, fast = _per_row_us(default_path, rows, args.repeat), _per_row_us(fast_path, rows, args.repeat)
+        print(f"{name:<16}{slow:>18.2f}{fast:>14.2f}{slow / fast:>9.1f}x")
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,8 @@ from fastapi import APIRouter
 from app.api.endpoints import (auth_route, user_route, specialties_router,
                                schedules_router, appointments_router,
                                branches_router, sections_router, rooms_router,
-                               payments_router)
+                               payments_router, doctors_router, availability_router,
+                               diagnostics_router)
 
 api_router = APIRouter()
 api_router.include_router(auth_route, prefix='/auth', tags=['Auth'])
@@ -15,3 +16,6 @@ api_router.include_router(branches_router)
 api_router.include_router(sections_router)
 api_router.include_router(rooms_router)
 api_router.include_router(payments_router)
+api_router.include_router(doctors_router)
+api_router.include_router(availability_router)
+api_router.include_router(diagnostics_router)
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,12 +7,83 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8')
     DATABASE_URL: str
+    # GET handlerlar uchun read-only replica; berilmasa asosiy baza ishlatiladi
+    READ_DATABASE_URL: str | None = None
+    # Yozgan klient shuncha sekund davomida o'qishni ham asosiy bazadan qiladi (read-your-writes)
+    READ_YOUR_WRITES_WINDOW: int = 5
+    # Connection pool (SQLite :memory: bundan mustasno)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    # SQLite: har bir ulanishga qo'llanadigan PRAGMA profili (app/db/sqlite.py) va alohida qiymatlar
+    SQLITE_PRAGMA_PROFILE: Literal['durable', 'throughput'] = 'durable'
+    SQLITE_PRAGMA_OVERRIDES: dict[str, str | int] = {}
+    # Group commit: yozuvlar bitta writer orqali WINDOW_MS ichida bitta tranzaksiyaga yig'iladi
+    WRITE_PIPELINE_ENABLED: bool = False
+    WRITE_PIPELINE_WINDOW_MS: float = 2
+    WRITE_PIPELINE_MAX_BATCH: int = 64
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     ALGORITHM: str
     SECRET_KEY: str
     REFRESH_TOKEN_EXPIRE_DAYS: int
     REFRESH_COOKIE_NAME: str
 
+    # bcrypt uchun alohida thread pool (event loopni bloklamaslik uchun)
+    HASH_POOL_WORKERS: int = 4
+    HASH_POOL_QUEUE_SIZE: int = 64
+    HASH_POOL_RETRY_AFTER: int = 1
+    # make calibrate_bcrypt natijasi; None bo'lsa passlib default rounds ishlatiladi
+    BCRYPT_ROUNDS: int | None = None
+
+    # Workerlar orasida umumiy holat (revoked jti va h.k.) saqlanadigan lokal SQLite fayl
+    SHARED_STATE_PATH: str = './shared_state.db'
+    # memory - faqat bitta process uchun, sqlite - barcha workerlar uchun umumiy
+    REVOCATION_BACKEND: Literal['memory', 'sqlite'] = 'sqlite'
+    REVOCATION_PURGE_INTERVAL: int = 60
+
+    # Token bucket: "<sig'im>/<sekund>" - masalan "10/60" = 60 sekundda 10 ta urinish
+    RATE_LIMIT_BACKEND: Literal['memory', 'sqlite'] = 'sqlite'
+    LOGIN_RATE_PER_IP: str = '20/60'
+    LOGIN_RATE_PER_ACCOUNT: str = '5/60'
+    REFRESH_RATE_PER_IP: str = '60/60'
+    REFRESH_RATE_PER_ACCOUNT: str = '10/60'
+
+    # get_current_user uchun principal kesh (user_id -> User)
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL: int = 30
+
+    # Imzosi tekshirilgan tokenlar keshi (sha256(token) -> claims), yozuv token exp da o'chadi
+    TOKEN_CACHE_SIZE: int = 10_000
+
+    # Ro'yxatlar uchun X-Total-Count: filtrlangan natija shu songacha aniq sanaladi,
+    # filtrsiz jadval soni (kichik bo'lsa aniq, katta bo'lsa taxminiy) shuncha sekund keshlanadi
+    COUNT_EXACT_LIMIT: int = 10_000
+    COUNT_CACHE_TTL: int = 60
+
+    # Ro'yxatlarni TypeAdapter + pydantic-core JSON bilan serializatsiya qilish (app.api.serialization)
+    FAST_SERIALIZATION: bool = False
+
+    # /appointments/export, /payments/export: bir martada o'qiladigan qatorlar soni
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # /branches/tree: tayyor daraxt JSON keshi. Kalitda jadval versiyalari bor, yozishlar uni
+    # darhol eskirtiradi; TTL faqat API dan tashqari (migratsiya, qo'lda SQL) o'zgarishlar uchun
+    TREE_CACHE_SIZE: int = 256
+    TREE_CACHE_TTL: int = 300
+
+    # Uchrashuvning maksimal davomiyligi: bandlik (doctor_id, start_at) indeksida
+    # start_at >= from - shu oraliq diapazoni bilan qidiriladi
+    MAX_APPOINTMENT_MINUTES: int = 240
+    # /doctors/{id}/availability: bitta so'rovdagi eng uzun davr
+    AVAILABILITY_MAX_DAYS: int = 31
+
+    # RS256/ES256 uchun: <kid>.pem (private) va <kid>.pub.pem (faqat tekshirish) fayllari joylashgan papka
+    JWT_KEYS_DIR: str | None = None
+    JWT_ACTIVE_KID: str | None = None
+    JWKS_MAX_AGE: int = 300
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class PoolStats:
+    # Pooldan ulanish olish (checkout) uchun ketgan vaqt: jami, eng katta va oxirgi N ta o'lchov
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._recent: deque[float] = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts, total, peak = self.checkouts, self.timeouts, self.total_wait, self.max_wait
+
+        def pct(p: float) -> float:
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))] * 1000, 3) if recent else 0.0
+
+        return {
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'wait_ms_avg': round(total / checkouts * 1000, 3) if checkouts else 0.0,
+            'wait_ms_p50': pct(0.50),
+            'wait_ms_p99': pct(0.99),
+            'wait_ms_max': round(peak * 1000, 3),
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return conn
+
+
+def pool_status(pool: Pool) -> dict:
+    status = {'class': type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'timeout': pool.timeout(),
+        })
+    if isinstance(pool, InstrumentedPool):
+        status.update(pool.stats.snapshot())
+    return status
@@ -0,0 +1,177 @@
+# Ro'yxat so'rovlari uchun EXPLAIN QUERY PLAN regressiya tekshiruvi.
+# Modellardan bo'sh in-memory SQLite sxema quriladi, har bir ro'yxat so'rovining keyset sahifasi
+# (birinchi va cursor bilan keyingi) rejasi olinadi. Filtrlangan so'rovda indekssiz
+# "SCAN <jadval>" yoki istalgan so'rovda "TEMP B-TREE" (sahifa uchun hamma qatorni saralash)
+# chiqsa, exit code 1. Reja tartibni tekshirmaydi, shuning uchun filtrsiz so'rovlar namunaviy
+# qatorlar bilan ham yuritiladi: cursor dan keyingi/oldingi sahifa aynan qo'shni qatorlarni qaytarishi kerak
+# (list_query o'z ORDER BY ini qo'shsa, prev sahifa jadval boshini qaytaradi).
+#   python -m app.db.query_plans [-v]
+import argparse
+import re
+import sys
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, insert
+from sqlmodel import SQLModel
+
+from app.api.endpoints import (appointments, branches, payments, rooms, schedules, sections,
+                               specialties, user)
+from app.api.pagination import keyset_query
+from app.models import Appointment, Branch, DoctorSchedule, Payment, Role, Room, Section, Specialty, User
+from app.models.enums import AppointmentStatus, PaymentStatus, PaymentMethod, Weekday
+
+APPOINTMENT_KEYS = [Appointment.start_at, Appointment.id]
+
+# nom -> (so'rov, keyset kalitlari, filtrlanganmi)
+# Prefiks LIKE qidiruvlari bu yerda yo'q: SQLite LIKE registrsiz ishlagani uchun oddiy (BINARY)
+# indeksdan foydalana olmaydi (matn qidiruvi /doctors/search da).
+CASES = {
+    'appointments': (appointments.list_query(), APPOINTMENT_KEYS, False),
+    'appointments?doctor_id': (appointments.list_query(doctor_id=1), APPOINTMENT_KEYS, True),
+    'appointments?patient_id': (appointments.list_query(patient_id=1), APPOINTMENT_KEYS, True),
+    'appointments?status': (appointments.list_query(status=AppointmentStatus.pending), APPOINTMENT_KEYS, True),
+    'appointments?doctor_id&status': (appointments.list_query(doctor_id=1, status=AppointmentStatus.pending),
+                                      APPOINTMENT_KEYS, True),
+    'appointments?patient_id&status': (appointments.list_query(patient_id=1, status=AppointmentStatus.pending),
+                                       APPOINTMENT_KEYS, True),
+    'appointments/{id}/history': (appointments.history_query(1), None, True),
+    'payments': (payments.list_query(), [Payment.id], False),
+    'payments?appointment_id': (payments.list_query(appointment_id=1), [Payment.id], True),
+    'payments?status': (payments.list_query(status=PaymentStatus.pending), [Payment.id], True),
+    'payments?method': (payments.list_query(method=PaymentMethod.cash), [Payment.id], True),
+    'payments?status&method': (payments.list_query(status=PaymentStatus.pending, method=PaymentMethod.cash),
+                               [Payment.id], True),
+    'branches': (branches.list_query(), [Branch.id], False),
+    'sections': (sections.list_query(), [Section.id], False),
+    'sections?branch_id': (sections.list_query(branch_id=1), [Section.id], True),
+    'rooms': (rooms.list_query(), [Room.id], False),
+    'rooms?section_id': (rooms.list_query(section_id=1), [Room.id], True),
+    'specialties': (specialties.list_query(), [Specialty.id], False),
+    'schedules': (schedules.list_query(), [DoctorSchedule.id], False),
+    'schedules?doctor_id': (schedules.list_query(doctor_id=1), [DoctorSchedule.id], True),
+    'schedules?weekday': (schedules.list_query(weekday=Weekday.mon), [DoctorSchedule.id], True),
+    'schedules?doctor_id&weekday': (schedules.list_query(doctor_id=1, weekday=Weekday.mon),
+                                    [DoctorSchedule.id], True),
+    'users': (user.list_query(), [User.id], False),
+    'users?role': (user.list_query(role=Role.doctor), [User.id], True),
+}
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+SAMPLE_KEY = {'start_at': datetime(2030, 1, 1, 9), 'id': 1}
+
+
+def explain(conn, stmt) -> list[str]:
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def pages(name: str, q, keys) -> dict:
+    if keys is None:
+        return {name: (q, False)}
+    values = [SAMPLE_KEY[k.key] for k in keys]
+    return {
+        name: (keyset_query(q, keys).limit(10), False),
+        f"{name} (cursor)": (keyset_query(q, keys, values).limit(10), True),
+        f"{name} (prev)": (keyset_query(q, keys, values, 'prev').limit(10), True),
+    }
+
+
+def problems(plan: list[str], must_seek: bool) -> list[str]:
+    found = [line for line in plan if 'TEMP B-TREE' in line]
+    if must_seek:
+        found += [line for line in plan if FULL_SCAN.match(line)]
+    return found
+
+
+SAMPLE_ROWS = 6
+
+
+def _sample_value(column, i: int):
+    if column.primary_key:
+        return i + 1
+    enum_class = getattr(column.type, 'enum_class', None)
+    if enum_class is not None:
+        return list(enum_class)[0]
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = str
+    # start < end CHECK cheklovlari uchun tugash ustunlari keyinroq
+    later = column.name.startswith('end') or column.name.endswith('_to')
+    if python_type is datetime:
+        return datetime(2030, 1, 1, 9) + timedelta(hours=i, minutes=30 if later else 0)
+    if python_type is time:
+        return time(17 if later else 9, i)
+    if python_type is Decimal:
+        return Decimal(i + 1)
+    if python_type is bool:
+        return False
+    return f'x{i}' if python_type is str else i + 1
+
+
+def seed(conn, tables) -> None:
+    # FK lar in-memory bazada tekshirilmaydi; qiymatlar unique cheklovlarga urilmasligi uchun qator bo'yicha farqli
+    for table in tables:
+        rows = [{c.name: _sample_value(c, i) for c in table.columns if not c.nullable or c.primary_key}
+                for i in range(SAMPLE_ROWS)]
+        conn.execute(insert(table), rows)
+
+
+def order_problems(conn, q, keys) -> list[str]:
+    full = [tuple(getattr(r, k.key) for k in keys) for r in conn.execute(keyset_query(q, keys))]
+    if len(full) < 5:
+        return []
+    pivot = full[3]
+    after = [tuple(getattr(r, k.key) for k in keys) for r in conn.execute(keyset_query(q, keys, pivot).limit(2))]
+    before = [tuple(getattr(r, k.key) for k in keys)
+              for r in conn.execute(keyset_query(q, keys, pivot, 'prev').limit(2))][::-1]
+    found = []
+    if after != full[4:6]:
+        found.append(f"cursor sahifasi {after}, kutilgan {full[4:6]}")
+    if before != full[1:3]:
+        found.append(f"prev sahifasi {before}, kutilgan {full[1:3]}")
+    return found
+
+
+def check(verbose: bool = False) -> list[str]:
+    engine = create_engine('sqlite://')
+    SQLModel.metadata.create_all(engine)
+    failures = []
+    with engine.connect() as conn:
+        for name, (q, keys, filtered) in CASES.items():
+            for page, (stmt, has_cursor) in pages(name, q, keys).items():
+                plan = explain(conn, stmt)
+                bad = problems(plan, filtered or has_cursor)
+                if bad:
+                    failures.append(f"{page}: {'; '.join(plan)}")
+                if verbose:
+                    print(f"{'FAIL' if bad else 'ok  '} {page}: {'; '.join(plan)}")
+        ordered = {name: (q, keys) for name, (q, keys, filtered) in CASES.items() if keys and not filtered}
+        seed(conn, {keys[-1].class_.__table__ for _, keys in ordered.values()})
+        for name, (q, keys) in ordered.items():
+            bad = order_problems(conn, q, keys)
+            if bad:
+                failures.append(f"{name} (tartib): {'; '.join(bad)}")
+            if verbose:
+                print(f"{'FAIL' if bad else 'ok  '} {name} (tartib)")
+    engine.dispose()
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Ro'yxat so'rovlari jadvalni to'liq skan/saralash qilmasligini tekshirish")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    failures = check(args.verbose)
+    for f in failures:
+        print(f"plan regression: {f}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print(f"{len(CASES)} ta ro'yxat so'rovi rejasi indeksdan foydalanadi")
+
+
+if __name__ == '__main__':
+    main()
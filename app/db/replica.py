@@ -0,0 +1,50 @@
+# Lokal sinov uchun SQLite "replica": DATABASE_URL faylini READ_DATABASE_URL fayliga
+# sqlite backup API orqali davriy nusxalaydi.
+#   python -m app.db.replica --interval 1
+import argparse
+import sqlite3
+import time
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+def sqlite_path(url: str) -> str:
+    u = make_url(url)
+    if u.get_backend_name() != 'sqlite' or not u.database or u.database == ':memory:':
+        raise SystemExit(f"SQLite fayl URL kerak: {url}")
+    return u.database
+
+
+def sync_once(primary_path: str, replica_path: str) -> None:
+    src = sqlite3.connect(primary_path)
+    dst = sqlite3.connect(replica_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite read replica ni asosiy baza bilan sinxron ushlab turish")
+    parser.add_argument('--interval', type=float, default=1.0, help="sinxronlash oralig'i (sekund)")
+    parser.add_argument('--once', action='store_true')
+    args = parser.parse_args()
+
+    if not settings.READ_DATABASE_URL:
+        raise SystemExit("READ_DATABASE_URL sozlanmagan")
+    primary, replica = sqlite_path(settings.DATABASE_URL), sqlite_path(settings.READ_DATABASE_URL)
+
+    while True:
+        sync_once(primary, replica)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+# Shifokorlar bo'yicha full-text qidiruv (ism, bio, mutaxassislik nomi).
+# SQLite: FTS5 virtual jadvali (doctor_fts), Postgres: tsvector + GIN (doctor_search).
+# Indeks bazaning o'zidagi triggerlar orqali users/specialty yozuvlari bilan sinxron turadi,
+# shuning uchun ilova kodidagi har bir yozish yo'lini kuzatish shart emas.
+import re
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Relevantlik faqat birinchi N ta moslik ichida hisoblanadi: "ka"* kabi keng prefiks
+# millionlab qatorga mos kelsa ham bm25/ts_rank hammasi uchun hisoblanmaydi
+SEARCH_CANDIDATES = 500
+
+# Alembic autogenerate bu jadvallarni "ortiqcha" deb o'chirishni taklif qilmasligi uchun
+SEARCH_TABLE_PREFIXES = ('doctor_fts', 'doctor_search')
+
+SQLITE_DDL = [
+    # prefix='2 3' - 2 va 3 harfli prefikslar uchun alohida indeks ("kar"* tez topiladi)
+    """CREATE VIRTUAL TABLE doctor_fts USING fts5(
+        full_name, specialty, bio,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )""",
+    # ORDER BY rank shu vaznlar bilan bm25: ism > mutaxassislik > bio
+    "INSERT INTO doctor_fts(doctor_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')",
+    """INSERT INTO doctor_fts(rowid, full_name, specialty, bio)
+       SELECT u.id, u.full_name, s.name, coalesce(u.bio, '')
+       FROM users u LEFT JOIN specialty s ON s.id = u.specialty_id
+       WHERE u.role = 'doctor'""",
+]
+
+SQLITE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS doctor_fts_ai AFTER INSERT ON users WHEN new.role = 'doctor' BEGIN
+        INSERT INTO doctor_fts(rowid, full_name, specialty, bio)
+        VALUES (new.id, new.full_name, (SELECT name FROM specialty WHERE id = new.specialty_id), coalesce(new.bio, ''));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS doctor_fts_au AFTER UPDATE OF full_name, bio, role, specialty_id ON users BEGIN
+        DELETE FROM doctor_fts WHERE rowid = old.id;
+        INSERT INTO doctor_fts(rowid, full_name, specialty, bio)
+        SELECT new.id, new.full_name, (SELECT name FROM specialty WHERE id = new.specialty_id), coalesce(new.bio, '')
+        WHERE new.role = 'doctor';
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS doctor_fts_ad AFTER DELETE ON users BEGIN
+        DELETE FROM doctor_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS specialty_fts_au AFTER UPDATE OF name ON specialty BEGIN
+        UPDATE doctor_fts SET specialty = new.name
+        WHERE rowid IN (SELECT id FROM users WHERE specialty_id = new.id AND role = 'doctor');
+    END""",
+]
+
+POSTGRES_DDL = [
+    """CREATE TABLE IF NOT EXISTS doctor_search (
+        user_id integer PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_doctor_search_document ON doctor_search USING gin (document)",
+    """CREATE OR REPLACE FUNCTION doctor_search_document(full_name text, specialty text, bio text)
+       RETURNS tsvector LANGUAGE sql IMMUTABLE AS $$
+        SELECT setweight(to_tsvector('simple', coalesce(full_name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(specialty, '')), 'B')
+            || setweight(to_tsvector('simple', coalesce(bio, '')), 'C')
+    $$""",
+    """CREATE OR REPLACE FUNCTION doctor_search_user_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        DELETE FROM doctor_search WHERE user_id = NEW.id;
+        IF NEW.role = 'doctor' THEN
+            INSERT INTO doctor_search (user_id, document)
+            VALUES (NEW.id, doctor_search_document(NEW.full_name,
+                    (SELECT name FROM specialty WHERE id = NEW.specialty_id), NEW.bio));
+        END IF;
+        RETURN NULL;
+    END $$""",
+    """CREATE OR REPLACE FUNCTION doctor_search_specialty_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE doctor_search d SET document = doctor_search_document(u.full_name, NEW.name, u.bio)
+        FROM users u WHERE u.id = d.user_id AND u.specialty_id = NEW.id;
+        RETURN NULL;
+    END $$""",
+    "DROP TRIGGER IF EXISTS doctor_search_user ON users",
+    """CREATE TRIGGER doctor_search_user AFTER INSERT OR UPDATE OF full_name, bio, role, specialty_id ON users
+       FOR EACH ROW EXECUTE FUNCTION doctor_search_user_sync()""",
+    "DROP TRIGGER IF EXISTS doctor_search_specialty ON specialty",
+    """CREATE TRIGGER doctor_search_specialty AFTER UPDATE OF name ON specialty
+       FOR EACH ROW EXECUTE FUNCTION doctor_search_specialty_sync()""",
+    """INSERT INTO doctor_search (user_id, document)
+       SELECT u.id, doctor_search_document(u.full_name, s.name, u.bio)
+       FROM users u LEFT JOIN specialty s ON s.id = u.specialty_id
+       WHERE u.role = 'doctor'
+       ON CONFLICT (user_id) DO NOTHING""",
+]
+
+
+def install_search(conn: Connection) -> None:
+    # Idempotent: init_db har startda chaqiradi (SQLite batch migratsiyalari users jadvalini
+    # qayta yaratganda triggerlar yo'qoladi - shu yerda tiklanadi)
+    if conn.dialect.name == 'sqlite':
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'doctor_fts'").first()
+        if not exists:
+            for stmt in SQLITE_DDL:
+                conn.exec_driver_sql(stmt)
+        for stmt in SQLITE_TRIGGERS:
+            conn.exec_driver_sql(stmt)
+    elif conn.dialect.name == 'postgresql':
+        for stmt in POSTGRES_DDL:
+            conn.exec_driver_sql(stmt)
+
+
+def drop_search(conn: Connection) -> None:
+    if conn.dialect.name == 'sqlite':
+        for name in ('doctor_fts_ai', 'doctor_fts_au', 'doctor_fts_ad', 'specialty_fts_au'):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        conn.exec_driver_sql("DROP TABLE IF EXISTS doctor_fts")
+    elif conn.dialect.name == 'postgresql':
+        conn.exec_driver_sql("DROP TRIGGER IF EXISTS doctor_search_user ON users")
+        conn.exec_driver_sql("DROP TRIGGER IF EXISTS doctor_search_specialty ON specialty")
+        conn.exec_driver_sql("DROP TABLE IF EXISTS doctor_search")
+        conn.exec_driver_sql("DROP FUNCTION IF EXISTS doctor_search_user_sync(), doctor_search_specialty_sync(), "
+                             "doctor_search_document(text, text, text)")
+
+
+def search_terms(q: str) -> list[str]:
+    return re.findall(r'\w+', q.lower())[:8]
+
+
+def _shorten(term: str) -> str:
+    # Xato oxirgi harflarda bo'lsa ("kardiolg") qisqa prefiks baribir topadi
+    return term if len(term) <= 3 else term[:max(3, len(term) - 2)]
+
+
+def candidate_queries(terms: list[str]) -> list[tuple[list[str], str]]:
+    # Avval aniq prefikslar (AND), topilmasa qisqartirilgan prefikslar (AND), keyin (OR)
+    short = [_shorten(t) for t in terms]
+    candidates = [(terms, 'AND')]
+    if short != terms:
+        candidates.append((short, 'AND'))
+    if len(short) > 1:
+        candidates.append((short, 'OR'))
+    return candidates
+
+
+async def _match_ids(db: AsyncSession, terms: list[str], op: str, limit: int) -> list[int]:
+    if db.bind.dialect.name == 'postgresql':
+        query = f" {'&' if op == 'AND' else '|'} ".join(f"{t}:*" for t in terms)
+        sql = text("SELECT user_id FROM (SELECT user_id, document, query FROM doctor_search, "
+                   "to_tsquery('simple', :q) query WHERE document @@ query LIMIT :n) c "
+                   "ORDER BY ts_rank(document, query) DESC, user_id LIMIT :k")
+    else:
+        query = f" {op} ".join(f'"{t}"*' for t in terms)
+        sql = text("SELECT rowid FROM (SELECT rowid, rank FROM doctor_fts WHERE doctor_fts MATCH :q LIMIT :n) "
+                   "ORDER BY rank LIMIT :k")
+    params = {'q': query, 'k': limit, 'n': SEARCH_CANDIDATES}
+    return list((await db.execute(sql, params)).scalars())
+
+
+async def search_doctor_ids(db: AsyncSession, q: str, limit: int = 20) -> list[int]:
+    terms = search_terms(q)
+    if not terms:
+        return []
+    for candidate, op in candidate_queries(terms):
+        ids = await _match_ids(db, candidate, op, limit)
+        if ids:
+            return ids
+    return []
@@ -1,23 +1,78 @@
-from typing import Generator
+from typing import AsyncGenerator
+
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from sqlmodel import SQLModel, create_engine, Session, text
 from app.core.config import get_settings
+from app.db.pool import InstrumentedPool
+from app.db.search import install_search
+from app.db.sqlite import apply_sqlite_profile
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith('sqlite') else {}
-)
+
+def to_async_url(url: str) -> str:
+    # .env dagi URL alembic (sync) uchun ham ishlatiladi, ilova esa async driver bilan ulanadi
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend == 'sqlite' and u.drivername != 'sqlite+aiosqlite':
+        u = u.set(drivername='sqlite+aiosqlite')
+    elif backend == 'postgresql' and u.get_driver_name() not in ('asyncpg', 'psycopg'):
+        u = u.set(drivername='postgresql+asyncpg')
+    return u.render_as_string(hide_password=False)
+
+
+def pool_options(url: str) -> dict:
+    u = make_url(url)
+    if u.get_backend_name() == 'sqlite' and u.database in (None, '', ':memory:'):
+        return {}
+    return {
+        'poolclass': InstrumentedPool,
+        'pool_size': settings.DB_POOL_SIZE,
+        'max_overflow': settings.DB_MAX_OVERFLOW,
+        'pool_timeout': settings.DB_POOL_TIMEOUT,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+        'pool_pre_ping': settings.DB_POOL_PRE_PING,
+    }
+
+
+def build_engine(url: str):
+    new_engine = create_async_engine(to_async_url(url), **pool_options(url))
+    if new_engine.dialect.name == 'sqlite':
+        apply_sqlite_profile(new_engine.sync_engine, settings.SQLITE_PRAGMA_PROFILE, settings.SQLITE_PRAGMA_OVERRIDES)
+    return new_engine
+
+
+engine = build_engine(settings.DATABASE_URL)
+read_engine = build_engine(settings.READ_DATABASE_URL) if settings.READ_DATABASE_URL else engine
+
+async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async_read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+# Klient yozgandan keyin qo'yiladigan cookie (app.main dagi middleware), yoki so'rovdagi header
+READ_YOUR_WRITES_COOKIE = 'ryw'
+READ_YOUR_WRITES_HEADER = 'X-Read-Your-Writes'
+
+
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(install_search)
+
+
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session() as session:
+        yield session
 
 
-def init_db():
-    SQLModel.metadata.create_all(engine)
-    if settings.DATABASE_URL.startswith('sqlite'):
-        with Session(engine) as session:
-            session.execute(text("PRAGMA foreign_keys=ON"))
+def wants_primary(request: Request) -> bool:
+    return request.headers.get(READ_YOUR_WRITES_HEADER) == '1' or READ_YOUR_WRITES_COOKIE in request.cookies
 
 
-def get_session() -> Generator:
-    with Session(engine) as session:
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    factory = async_session if wants_primary(request) else async_read_session
+    async with factory() as session:
         yield session
@@ -0,0 +1,20 @@
+import sqlite3
+import threading
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Bir mashinadagi barcha uvicorn workerlar ko'radigan kichik lokal SQLite fayl.
+# Har bir thread o'z ulanishini oladi (sqlite3 ulanishini threadlar orasida bo'lishmaymiz).
+_local = threading.local()
+
+
+def get_state_connection() -> sqlite3.Connection:
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(settings.SHARED_STATE_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    return conn
@@ -0,0 +1,112 @@
+# SQLite PRAGMA profillari. Profillarni shu mashinada solishtirish (vaqtinchalik fayl, parallel o'qish/yozish):
+#   python -m app.db.sqlite --seconds 5 --readers 8 --writers 4
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Har bir yangi ulanishga qo'llanadigan PRAGMA to'plamlari.
+# durable    - WAL, har commitda fsync (synchronous=FULL)
+# throughput - WAL + synchronous=NORMAL, katta page cache va mmap; elektr o'chsa oxirgi commitlar yo'qolishi mumkin
+SQLITE_PROFILES: dict[str, dict[str, str | int]] = {
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'foreign_keys': 'ON',
+        'busy_timeout': 5000,
+    },
+    'throughput': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'foreign_keys': 'ON',
+        'busy_timeout': 5000,
+        'cache_size': -64000,  # ~64 MB
+        'mmap_size': 268435456,  # 256 MB
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+def apply_sqlite_profile(engine: Engine, profile: str, overrides: dict[str, str | int] | None = None) -> None:
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Noma'lum SQLITE_PRAGMA_PROFILE: {profile} ({', '.join(SQLITE_PROFILES)})")
+    pragmas = {**SQLITE_PROFILES[profile], **(overrides or {})}
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        # Driverning o'z BEGIN boshqaruvini o'chiramiz (SAVEPOINT to'g'ri ishlashi uchun), BEGIN ni "begin" da beramiz
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        # execution_options(sqlite_begin='IMMEDIATE') - yozish lockini tranzaksiya boshida olish
+        conn.exec_driver_sql(f"BEGIN {conn.get_execution_options().get('sqlite_begin', 'DEFERRED')}")
+
+
+async def _bench_profile(profile: str | None, seconds: float, readers: int, writers: int) -> dict:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    engine = create_async_engine(f'sqlite+aiosqlite:///{path}', pool_size=readers + writers, max_overflow=0)
+    if profile is not None:
+        apply_sqlite_profile(engine.sync_engine, profile)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE bench (id INTEGER PRIMARY KEY, payload TEXT NOT NULL)"))
+        await conn.execute(text("INSERT INTO bench (payload) VALUES (:p)"), [{'p': 'x' * 200}] * 1000)
+
+    timings = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+    deadline = time.perf_counter() + seconds
+
+    async def worker(kind: str, n: int):
+        i = n
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if kind == 'write':
+                    async with engine.begin() as conn:
+                        await conn.execute(text("INSERT INTO bench (payload) VALUES (:p)"), {'p': 'y' * 200})
+                else:
+                    async with engine.connect() as conn:
+                        await conn.execute(text("SELECT payload FROM bench WHERE id = :id"), {'id': i % 1000 + 1})
+            except Exception:
+                errors[kind] += 1
+                continue
+            timings[kind].append((time.perf_counter() - started) * 1000)
+            i += 7
+
+    await asyncio.gather(*(worker('read', n) for n in range(readers)), *(worker('write', n) for n in range(writers)))
+    await engine.dispose()
+    return {kind: (len(t) / seconds, statistics.quantiles(t, n=100)[98] if len(t) > 1 else float('nan'), errors[kind])
+            for kind, t in timings.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite PRAGMA profillari: parallel o'qish/yozish o'tkazuvchanligi")
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.readers} o'quvchi, {args.writers} yozuvchi, har profil {args.seconds:g} s")
+    print(f"{'profil':<12}{'read/s':>10}{'read p99':>10}{'write/s':>10}{'write p99':>11}{'xato':>7}")
+    # None - PRAGMA siz (SQLite standarti: rollback journal, synchronous=FULL)
+    for profile in [*SQLITE_PROFILES, None]:
+        result = asyncio.run(_bench_profile(profile, args.seconds, args.readers, args.writers))
+        (reads, read_p99, read_errors), (writes, write_p99, write_errors) = result['read'], result['write']
+        print(f"{profile or '-':<12}{reads:>10.0f}{read_p99:>10.2f}{writes:>10.0f}{write_p99:>11.2f}"
+              f"{read_errors + write_errors:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# Jadval versiyalari (ETag va keshlar uchun). Har bir create/update/delete commit dan keyin
+# bump() qiladi; hisoblagich shared_state.db da, shuning uchun barcha workerlar bir xil versiyani ko'radi.
+# epoch - jadval yozuvi birinchi yaratilganda tasodifiy qiymat: fayl o'chirilib hisoblagich 0 dan
+# boshlansa ham eski ETag lar yangi versiyalar bilan mos tushib qolmaydi.
+import secrets
+
+from app.db.shared_state import get_state_connection
+
+_created = False
+
+
+def _conn():
+    global _created
+    conn = get_state_connection()
+    if not _created:
+        conn.execute("CREATE TABLE IF NOT EXISTS table_versions ("
+                     "name TEXT PRIMARY KEY, epoch TEXT NOT NULL, version INTEGER NOT NULL) WITHOUT ROWID")
+        _created = True
+    return conn
+
+
+def get_version(table: str) -> str:
+    conn = _conn()
+    row = conn.execute("SELECT epoch, version FROM table_versions WHERE name = ?", (table,)).fetchone()
+    if row is None:
+        conn.execute("INSERT OR IGNORE INTO table_versions (name, epoch, version) VALUES (?, ?, 0)",
+                     (table, secrets.token_hex(4)))
+        row = conn.execute("SELECT epoch, version FROM table_versions WHERE name = ?", (table,)).fetchone()
+    return f'{row[0]}.{row[1]}'
+
+
+def get_versions(*models) -> str:
+    return '-'.join(f'{m.__tablename__}.{get_version(m.__tablename__)}' for m in models)
+
+
+def bump(model) -> None:
+    table = model.__tablename__
+    conn = _conn()
+    updated = conn.execute("UPDATE table_versions SET version = version + 1 WHERE name = ?", (table,)).rowcount
+    if not updated:
+        conn.execute("INSERT OR IGNORE INTO table_versions (name, epoch, version) VALUES (?, ?, 1)",
+                     (table, secrets.token_hex(4)))
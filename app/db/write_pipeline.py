@@ -0,0 +1,119 @@
+import asyncio
+import contextlib
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import async_session
+
+settings = get_settings()
+
+WriteOp = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class WritePipeline:
+    # Bir nechta so'rovning yozuvlarini bitta writer orqali bitta tranzaksiyaga yig'adi (group commit).
+    # Har bir op o'z SAVEPOINT ida bajariladi: xato bergan op faqat o'zini bekor qiladi,
+    # qolganlari bitta COMMIT (bitta fsync) bilan saqlanadi.
+
+    def __init__(self, session_factory: async_sessionmaker, window_ms: float, max_batch: int):
+        self._session_factory = session_factory
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self.batches = 0
+        self.ops = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def submit(self, op: WriteOp) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await self._commit_batch(batch)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _commit_batch(self, batch: list) -> None:
+        applied = []
+        async with self._session_factory() as session:
+            await session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+            for op, future in batch:
+                if future.done():  # so'rov bekor qilingan
+                    continue
+                try:
+                    async with session.begin_nested():
+                        result = await op(session)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                applied.append((future, result))
+            await session.commit()
+
+        self.batches += 1
+        self.ops += len(applied)
+        for future, result in applied:
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            'enabled': settings.WRITE_PIPELINE_ENABLED,
+            'batches': self.batches,
+            'ops': self.ops,
+            'avg_batch': round(self.ops / self.batches, 2) if self.batches else 0.0,
+            'queued': self._queue.qsize() if self._queue else 0,
+        }
+
+
+write_pipeline = WritePipeline(async_session,
+                               window_ms=settings.WRITE_PIPELINE_WINDOW_MS,
+                               max_batch=settings.WRITE_PIPELINE_MAX_BATCH)
+
+
+async def run_write(db: AsyncSession, op: WriteOp) -> Any:
+    # WRITE_PIPELINE_ENABLED bo'lsa op writer orqali boshqa so'rovlar bilan birga commit qilinadi,
+    # aks holda so'rovning o'z sessiyasida darhol commit bo'ladi
+    if settings.WRITE_PIPELINE_ENABLED:
+        return await write_pipeline.submit(op)
+    result = await op(db)
+    await db.commit()
+    if result is not None:
+        await db.refresh(result)
+    return result
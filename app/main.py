@@ -1,17 +1,35 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 
+from app.api.endpoints import well_known_router
+from app.api.security_utils.hash_pool import hash_pool
 from app.api.v1.routers import api_router
-from app.db.session import init_db
+from app.db.session import init_db, engine, read_engine, READ_YOUR_WRITES_COOKIE, settings
+from app.db.write_pipeline import write_pipeline
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    init_db()
+    await init_db()
+    if settings.WRITE_PIPELINE_ENABLED:
+        await write_pipeline.start()
     yield
+    await write_pipeline.stop()
+    hash_pool.shutdown()
 
 
 app = FastAPI(title='Fast API doctolib', version='1.0.0', lifespan=lifespan)
 
+if read_engine is not engine:
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        # Muvaffaqiyatli yozuvdan keyin klient qisqa vaqt replica emas, asosiy bazadan o'qiydi
+        response = await call_next(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            response.set_cookie(READ_YOUR_WRITES_COOKIE, '1', max_age=settings.READ_YOUR_WRITES_WINDOW, httponly=True)
+        return response
+
+
 app.include_router(api_router, prefix='/api/v1')
+app.include_router(well_known_router)
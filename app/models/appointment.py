@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Index
 from app.models.enums import AppointmentStatus
 
 from typing import TYPE_CHECKING
@@ -14,6 +14,15 @@ if TYPE_CHECKING:
 
 class Appointment(SQLModel, table=True):  # Uchrashuv vaqti
     __tablename__ = "appointment"
+    __table_args__ = (
+        # Ro'yxat va bandlik tekshiruvlari: resurs bo'yicha filter + vaqt bo'yicha tartib/oraliq
+        Index("ix_appointment_doctor_start", "doctor_id", "start_at"),
+        Index("ix_appointment_patient_start", "patient_id", "start_at"),
+        Index("ix_appointment_room_start", "room_id", "start_at"),
+        Index("ix_appointment_status_start", "status", "start_at"),
+        # Filtrsiz ro'yxat (start_at, id) bo'yicha keyset pagination
+        Index("ix_appointment_start_at", "start_at"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
 
     doctor_id: Optional[int] = Field(foreign_key="users.id", ondelete='SET NULL', nullable=True)
@@ -43,6 +52,9 @@ class Appointment(SQLModel, table=True):  # Uchrashuv vaqti
 
 class AppointmentStatusHistory(SQLModel, table=True):
     __tablename__ = "appointment_status_history"
+    __table_args__ = (
+        Index("ix_status_history_appointment_changed", "appointment_id", "changed_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     appointment_id: int = Field(foreign_key="appointment.id", nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint, CheckConstraint
+from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint, CheckConstraint, Index
 from typing import TYPE_CHECKING, Optional, List
 
 if TYPE_CHECKING:
@@ -21,7 +21,7 @@ class Section(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(nullable=False)
 
-    branch_id: int = Field(foreign_key='branch.id', nullable=False)
+    branch_id: int = Field(foreign_key='branch.id', nullable=False, index=True)
     branch: "Branch" = Relationship(back_populates='sections')
 
     rooms: list["Room"] = Relationship(back_populates='section')
@@ -38,7 +38,7 @@ class Room(SQLModel, table=True):
 
     appointments: List["Appointment"] = Relationship(back_populates='room')
 
-    section_id: int = Field(foreign_key='section.id', nullable=False)
+    section_id: int = Field(foreign_key='section.id', nullable=False, index=True)
     section: "Section" = Relationship(back_populates='rooms')
 
 
@@ -46,6 +46,8 @@ class RoomClosure(SQLModel, table=True):
     __tablename__ = "room_closure"
     __table_args__ = (
         CheckConstraint("closed_from < closed_to", name="ck_closure_time"),
+        # Oraliq bilan kesishish: closed_to > from shartida faqat hozirgi/kelgusi yopilishlar o'qiladi
+        Index("ix_room_closure_room_to", "room_id", "closed_to"),
     )
 
     id: Optional[int] = Field(default=None, primary_key=True)
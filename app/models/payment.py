@@ -27,8 +27,8 @@ class Payment(SQLModel, table=True):
     # ISO valyuta kodi (masalan, "UZS", "USD")
     currency: str = Field(sa_column=Column(String(3), nullable=False, default="UZS"))
 
-    method: PaymentMethod = Field(nullable=False)
-    status: PaymentStatus = Field(default=PaymentStatus.pending, nullable=False)
+    method: PaymentMethod = Field(nullable=False, index=True)
+    status: PaymentStatus = Field(default=PaymentStatus.pending, nullable=False, index=True)
     paid_at: Optional[datetime] = Field(default=None)
 
     # Kvitan­siya / tranzaksiya raqami (ixtiyoriy, lekin ko‘pincha noyob bo‘ladi)
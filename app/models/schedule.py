@@ -17,8 +17,8 @@ class DoctorSchedule(SQLModel, table=True):
     )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    doctor_id: int = Field(foreign_key="users.id", nullable=False)
-    weekday: Weekday = Field(nullable=False)
+    doctor_id: int = Field(foreign_key="users.id", nullable=False, index=True)
+    weekday: Weekday = Field(nullable=False, index=True)
     start_time: time = Field(nullable=False)
     end_time: time = Field(nullable=False)
 
@@ -17,12 +17,14 @@ class User(SQLModel, table=True):
     password: str = Field(nullable=False)
     full_name: str = Field(nullable=False)
     phone: str = Field(nullable=False)
-    role: Role = Field(nullable=False, default=Role.patient)
+    role: Role = Field(nullable=False, default=Role.patient, index=True)
     bio: Optional[str] = Field(default=None)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), nullable=False)
+    # Tokenlarga 'ver' claim sifatida yoziladi; oshirilsa userning barcha sessiyalari bekor bo'ladi
+    token_version: int = Field(default=0, nullable=False, sa_column_kwargs={'server_default': '0'})
 
     # ONE-TO-MANY SPECIALTY varianti:
-    specialty_id: Optional[int] = Field(default=None, foreign_key='specialty.id')
+    specialty_id: Optional[int] = Field(default=None, foreign_key='specialty.id', index=True)
     specialty: Optional["Specialty"] = Relationship(back_populates='users')
 
     # Appointments (ikki tomonga ajratilgan)
@@ -10,7 +10,7 @@ class AppointmentOut(SQLModel):
     room_id: int
     start_at: datetime
     end_at: datetime
-    note: str
+    note: str | None = None
 
 
 class AppointmentCreate(SQLModel):
@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from sqlmodel import SQLModel
+
+
+class SlotOut(SQLModel):
+    start_at: datetime
+    end_at: datetime
+
+
+class DoctorSlotOut(SlotOut):
+    doctor_id: int
+    room_id: int | None = None
@@ -62,3 +62,15 @@ class RoomUpdate(SQLModel):
     floor: int | None = None
     door_number: int | None = None
     section_id: int | None = None
+
+
+# ==================================
+# Tree (filial -> bo'limlar -> xonalar)
+# ==================================
+
+class SectionTreeOut(SectionOut):
+    rooms: list[RoomOut] = []
+
+
+class BranchTreeOut(BranchOut):
+    sections: list[SectionTreeOut] = []